@@ -6,11 +6,24 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 from typing import Dict, List, Any, Tuple
 import json
+import copy
+import hashlib
+from collections import OrderedDict
+from math import isfinite
 from scipy import stats
 from scipy.stats import mannwhitneyu, chi2_contingency
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.inspection import permutation_importance
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import confusion_matrix, roc_curve, auc
+import traceback
 import warnings
+import logging
 warnings.filterwarnings('ignore')
 
+# Configurar logger para este módulo
+logger = logging.getLogger(__name__)
+
 class AnalysisAndVisualization:
     """Clase para análisis y visualización de outliers"""
     
@@ -23,6 +36,8 @@ class AnalysisAndVisualization:
                 Si se proporciona, se usará para cargar datasets de forma centralizada.
         """
         self.data_processor = data_processor
+        self._pred_model_cache = OrderedDict()  # {clave: resultado} LRU del modelo predictivo
+        self._pred_model_cache_max_size = 16
     
     def _map_outlier_id_to_index(self, outlier_id: Any, df: pd.DataFrame, 
                                   subject_id_column: str = None) -> List[int]:
@@ -169,7 +184,8 @@ class AnalysisAndVisualization:
         
         # Cargar DataFrame usando método centralizado si está disponible
         if self.data_processor and filename and filename in self.data_processor.datasets:
-            df = self.data_processor.get_dataframe(filename)
+            # Copia propia: se añade la columna es_outlier y el DataFrame en caché se comparte
+            df = self.data_processor.get_dataframe(filename).copy()
         else:
             # Fallback: cargar directamente desde archivo
             file_path = dataset_info.get("file_path")
@@ -1128,7 +1144,6 @@ class AnalysisAndVisualization:
             return cleaned_results
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {
                 "error": str(e),
@@ -1303,7 +1318,7 @@ class AnalysisAndVisualization:
                         "outlier_indices": outlier_indices.tolist() if len(outlier_indices) <= 10 else outlier_indices[:10].tolist()
                     }
                 except Exception as e:
-                    print(f"Warning: Error processing robustness weights: {e}")
+                    logger.warning("Error procesando pesos de robustez: %s", e)
                     robustness_weights = None
             
             # Parámetros algorítmicos
@@ -1657,7 +1672,6 @@ class AnalysisAndVisualization:
                         "classes_found": list(unique_classes_after_dropna)
                     }
             except Exception as e:
-                import traceback
                 error_trace = traceback.format_exc()
                 return {
                     "error": f"Error preparando datos: {str(e)}",
@@ -1871,7 +1885,7 @@ class AnalysisAndVisualization:
                 model.fit(X_train_scaled, y_train)
             except Exception as e:
                 # Si falla, intentar con más regularización
-                print(f"Advertencia: Error en entrenamiento inicial, intentando con más regularización: {e}")
+                logger.warning("Error en entrenamiento inicial, intentando con más regularización: %s", e)
                 model = LogisticRegression(random_state=42, max_iter=1000, C=0.1, penalty='l2', solver='lbfgs')
                 model.fit(X_train_scaled, y_train)
                 warnings_list.append("Se aplicó regularización adicional debido a problemas de convergencia.")
@@ -1980,7 +1994,7 @@ class AnalysisAndVisualization:
                 intercept = float(model_stats.params[0]) if np.isfinite(model_stats.params[0]) else 0.0
                 
             except Exception as e:
-                print(f"Error con statsmodels, usando sklearn solamente: {e}")
+                logger.warning("Error con statsmodels, usando sklearn solamente: %s", e)
                 # Fallback a sklearn solamente
                 feature_names = numerical_cols + categorical_cols
                 coefficients = model.coef_[0].tolist() if len(model.coef_) > 0 else []
@@ -2096,7 +2110,6 @@ class AnalysisAndVisualization:
             return convert_numpy_types(result_dict)
             
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en regresión logística: {str(e)}"} 
     
@@ -2365,7 +2378,6 @@ class AnalysisAndVisualization:
             }
             
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en análisis de correlaciones comparativo: {str(e)}"}
     
@@ -2926,7 +2938,6 @@ class AnalysisAndVisualization:
             return result
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {"error": f"Error en análisis de clustering: {str(e)}"}
     
@@ -3140,7 +3151,6 @@ class AnalysisAndVisualization:
             return result
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {"error": f"Error en aplicación de K-means: {str(e)}"}
     
@@ -3566,7 +3576,6 @@ class AnalysisAndVisualization:
             return result
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {"error": f"Error en clustering jerárquico: {str(e)}"}
     
@@ -3852,7 +3861,6 @@ class AnalysisAndVisualization:
             return result
             
         except Exception as e:
-            import traceback
             traceback.print_exc()
             return {"error": f"Error en validación de clustering: {str(e)}"}
     
@@ -4029,7 +4037,6 @@ class AnalysisAndVisualization:
             return results
             
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en análisis demográfico/clínico: {str(e)}"}
     
@@ -4173,7 +4180,6 @@ class AnalysisAndVisualization:
             }
             
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en análisis de co-ocurrencia: {str(e)}"}
     
@@ -4510,7 +4516,6 @@ class AnalysisAndVisualization:
             return pca_results
             
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en PCA supervisado: {str(e)}"}
     
@@ -4762,7 +4767,6 @@ class AnalysisAndVisualization:
         except ImportError:
             return {"error": "La librería networkx no está instalada. Instala con: pip install networkx"}
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en análisis de redes: {str(e)}"}
     
@@ -4839,7 +4843,7 @@ class AnalysisAndVisualization:
             event_values = df_clean[event_variable]
             if event_values.dtype == 'bool':
                 events = event_values.astype(int)
-            elif event_values.dtype == 'object' or event_values.dtype.name == 'category':
+            elif event_values.dtype == 'object' or event_values.dtype.name in ('category', 'string', 'str'):
                 # Intentar convertir categorías a 0/1
                 unique_vals = event_values.unique()
                 if len(unique_vals) == 2:
@@ -4861,12 +4865,15 @@ class AnalysisAndVisualization:
             if (times <= 0).any():
                 return {"error": "La variable de tiempo debe contener solo valores positivos."}
             
-            # Separar por grupo de outliers
-            outliers_mask = df_clean['es_outlier'] == 'Outlier'
-            outliers_times = times[outliers_mask].values
-            outliers_events = events[outliers_mask].values
-            normal_times = times[~outliers_mask].values
-            normal_events = events[~outliers_mask].values
+            # Separar por grupo de outliers. Los arrays se normalizan una sola vez a
+            # float64 contiguo para que lifelines no los copie en cada llamada.
+            outliers_mask = (df_clean['es_outlier'] == 'Outlier').to_numpy()
+            t_arr = times.to_numpy()
+            e_arr = events.to_numpy()
+            outliers_times = np.ascontiguousarray(t_arr[outliers_mask], dtype=np.float64)
+            outliers_events = np.ascontiguousarray(e_arr[outliers_mask], dtype=np.float64)
+            normal_times = np.ascontiguousarray(t_arr[~outliers_mask], dtype=np.float64)
+            normal_events = np.ascontiguousarray(e_arr[~outliers_mask], dtype=np.float64)
             
             if len(outliers_times) < 3 or len(normal_times) < 3:
                 return {"error": "Insuficientes observaciones en al menos uno de los grupos (mínimo 3 por grupo)."}
@@ -4908,7 +4915,7 @@ class AnalysisAndVisualization:
             if events.sum() >= 5:  # Al menos 5 eventos totales
                 try:
                     cox_df = pd.DataFrame({
-                        'outlier_status': (df_clean['es_outlier'] == 'Outlier').astype(int).values,
+                        'outlier_status': outliers_mask.astype(int),
                         'T': times.values,
                         'E': events.values
                     })
@@ -4980,7 +4987,6 @@ class AnalysisAndVisualization:
         except ImportError:
             return {"error": "La librería lifelines no está instalada. Instala con: pip install lifelines"}
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en análisis de supervivencia: {str(e)}"}
     
@@ -5230,7 +5236,6 @@ class AnalysisAndVisualization:
                         "interpretation": interpretation
                     }
                 except Exception as e:
-                    import traceback
                     error_trace = traceback.format_exc()
                     results["kmeans_results"] = None
             
@@ -5257,33 +5262,31 @@ class AnalysisAndVisualization:
                     cluster_assignments_dbscan = {}
                     cluster_assignments_dbscan_ids = {}  # IDs de sujetos
                     subject_id_column_dbscan = outlier_results.get('subject_id_column') if outlier_results else None
-                    
-                    for idx, label in enumerate(dbscan_labels):
-                        if label == -1:
-                            continue  # Ruido
-                        outlier_idx = outliers_clean.index[idx]
-                        # Convertir label a int nativo de Python (no numpy)
-                        label_int = int(label) if not isinstance(label, (int, str)) else label
-                        
-                        # Obtener ID de sujeto
-                        subject_id = None
-                        if subject_id_column_dbscan and subject_id_column_dbscan in df.columns:
-                            subject_id = str(df.loc[outlier_idx, subject_id_column_dbscan])
-                        else:
-                            subject_id = f"ID_{outlier_idx}"
-                        
-                        if label_int not in cluster_assignments_dbscan:
-                            cluster_assignments_dbscan[label_int] = []
-                            cluster_assignments_dbscan_ids[label_int] = []
-                        
-                        # Agregar índice
+
+                    # Descartar ruido (-1) y agrupar por etiqueta con un único argsort estable
+                    keep = dbscan_labels != -1
+                    labels_kept = dbscan_labels[keep]
+                    idx_kept = outliers_clean.index.to_numpy()[keep]
+                    if subject_id_column_dbscan and subject_id_column_dbscan in df.columns:
+                        ids_kept = df.loc[outliers_clean.index, subject_id_column_dbscan].astype(str).to_numpy()[keep]
+                    else:
+                        ids_kept = np.array([f"ID_{outlier_idx}" for outlier_idx in idx_kept], dtype=object)
+
+                    order = np.argsort(labels_kept, kind='stable')
+                    sorted_labels = labels_kept[order]
+                    unique_labels, starts = np.unique(sorted_labels, return_index=True)
+                    idx_groups = np.split(idx_kept[order], starts[1:])
+                    id_groups = np.split(ids_kept[order], starts[1:])
+
+                    for label, idx_group, id_group in zip(unique_labels.tolist(), idx_groups, id_groups):
+                        # Agregar índices
                         try:
-                            cluster_assignments_dbscan[label_int].append(int(outlier_idx))
+                            cluster_assignments_dbscan[label] = [int(outlier_idx) for outlier_idx in idx_group]
                         except (ValueError, TypeError):
-                            cluster_assignments_dbscan[label_int].append(str(outlier_idx))
-                        
-                        # Agregar ID de sujeto
-                        cluster_assignments_dbscan_ids[label_int].append(subject_id)
+                            cluster_assignments_dbscan[label] = [str(outlier_idx) for outlier_idx in idx_group]
+
+                        # Agregar IDs de sujetos
+                        cluster_assignments_dbscan_ids[label] = [str(subject_id) for subject_id in id_group]
                     
                     results["dbscan_results"] = {
                         "n_clusters": n_clusters_dbscan,
@@ -5295,20 +5298,18 @@ class AnalysisAndVisualization:
                         "interpretation": f"DBSCAN identificó {n_clusters_dbscan} clusters densos y {n_noise} puntos de ruido."
                     }
                 except Exception as e:
-                    import traceback
                     error_trace = traceback.format_exc()
                     results["dbscan_results"] = None
             
             return results
             
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en clustering de outliers: {str(e)}"}
     
-    def predictive_model_analysis(self, df: pd.DataFrame, variable_types: Dict[str, str], predictors: List[str] = None, outlier_results: Dict[str, Any] = None) -> Dict[str, Any]:
+    def predictive_model_analysis(self, df: pd.DataFrame, variable_types: Dict[str, str], predictors: List[str] = None, outlier_results: Dict[str, Any] = None, oversample_minority: bool = False) -> Dict[str, Any]:
         """
-        Fase 3.2: Modelo Predictivo (Random Forest)
+        Fase 3.2: Modelo Predictivo (Random Forest / Histogram Gradient Boosting)
         
         Entrena un modelo para predecir la condición de outlier usando variables
         clínicas/demográficas y analiza la importancia de variables.
@@ -5318,16 +5319,14 @@ class AnalysisAndVisualization:
             variable_types: Diccionario con tipos de variables
             predictors: Lista de variables predictoras (si None, usa todas las numéricas y categóricas)
             outlier_results: Diccionario con resultados de detección de outliers (para obtener subject_id_column)
+            oversample_minority: Si True, aplica SMOTE (imbalanced-learn) solo al conjunto de
+                entrenamiento para sintetizar observaciones de la clase minoritaria. Si la
+                librería no está instalada se mantiene class_weight='balanced'.
         
         Returns:
             Diccionario con resultados del modelo predictivo
         """
         try:
-            from sklearn.ensemble import RandomForestClassifier
-            from sklearn.model_selection import train_test_split
-            from sklearn.preprocessing import LabelEncoder, StandardScaler
-            from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
-            
             if 'es_outlier' not in df.columns:
                 return {"error": "La columna 'es_outlier' no se encuentra en el DataFrame."}
             
@@ -5352,8 +5351,10 @@ class AnalysisAndVisualization:
             if not predictors:
                 return {"error": "No se encontraron variables predictoras válidas (excluyendo ID del sujeto)."}
             
-            # Preparar datos
-            df_clean = df[['es_outlier'] + predictors].dropna()
+            # Preparar datos: una sola reducción booleana sobre la matriz de NaN
+            model_cols = ['es_outlier'] + predictors
+            keep = ~df[model_cols].isna().to_numpy().any(axis=1)
+            df_clean = df.loc[keep, model_cols]
             
             if len(df_clean) < 10:
                 return {
@@ -5362,11 +5363,23 @@ class AnalysisAndVisualization:
                     "minimum_required": 10
                 }
             
-            # Codificar variable objetivo
-            le_target = LabelEncoder()
-            y = le_target.fit_transform(df_clean['es_outlier'])
-            
-            if len(set(y)) < 2:
+            # Reutilizar el modelo si ya se entrenó con los mismos predictores y datos.
+            # La invalidación es implícita: si los datos cambian, cambia el hash.
+            data_hash = hashlib.blake2b(
+                pd.util.hash_pandas_object(df_clean, index=False).values.tobytes(),
+                digest_size=16
+            ).hexdigest()
+            cache_key = (tuple(sorted((col, variable_types.get(col, '')) for col in predictors)), data_hash, oversample_minority)
+            if cache_key in self._pred_model_cache:
+                self._pred_model_cache.move_to_end(cache_key)
+                return copy.deepcopy(self._pred_model_cache[cache_key])
+            
+            # Codificar variable objetivo (pd.factorize: una sola pasada, clases ordenadas)
+            y, class_names = pd.factorize(df_clean['es_outlier'], sort=True)
+            
+            # Verificar distribución de clases ANTES de codificar/escalar features (un solo bincount sobre y)
+            counts = np.bincount(y)
+            if len(counts) < 2:
                 unique_classes_after_encoding = df_clean['es_outlier'].unique()
                 return {
                     "error": f"Only one class found in the data after encoding: {unique_classes_after_encoding[0] if len(unique_classes_after_encoding) > 0 else 'unknown'}. At least 2 classes are required for predictive modeling.",
@@ -5374,26 +5387,9 @@ class AnalysisAndVisualization:
                     "classes_found": list(unique_classes_after_encoding)
                 }
             
-            # Preparar features
-            X = df_clean[predictors].copy()
-            
-            # Codificar variables categóricas
-            le_dict = {}
-            for col in predictors:
-                if self.is_categorical_variable(variable_types.get(col, '')):
-                    le = LabelEncoder()
-                    X[col] = le.fit_transform(X[col].astype(str))
-                    le_dict[col] = le
-            
-            # Escalar variables numéricas
-            numeric_cols = [col for col in predictors if self.is_numeric_variable(variable_types.get(col, ''))]
-            if numeric_cols:
-                scaler = StandardScaler()
-                X[numeric_cols] = scaler.fit_transform(X[numeric_cols])
-            
-            # Verificar distribución de clases ANTES del split
-            unique_classes, class_counts = np.unique(y, return_counts=True)
-            min_class_count = min(class_counts) if len(class_counts) > 1 else class_counts[0]
+            unique_classes = np.nonzero(counts)[0]
+            class_counts = counts[unique_classes]
+            min_class_count = class_counts.min()
             
             # Validar que hay suficientes datos para entrenar y probar el modelo
             # Necesitamos al menos 2 de cada clase en el conjunto de entrenamiento
@@ -5422,6 +5418,42 @@ class AnalysisAndVisualization:
                         "minimum_required_per_class": 2
                     }
             
+            # Preparar features directamente como ndarray: solo se materializan los bloques
+            # numérico y categórico, sin copiar el DataFrame completo de predictores
+            # Clasificar cada predictor una sola vez; luego solo pruebas de pertenencia O(1)
+            cat_set = {col for col in predictors if self.is_categorical_variable(variable_types.get(col, ''))}
+            num_set = {col for col in predictors if self.is_numeric_variable(variable_types.get(col, ''))}
+            cat_cols = [col for col in predictors if col in cat_set]
+            numeric_cols = [col for col in predictors if col in num_set]
+            other_cols = [col for col in predictors if col not in cat_set and col not in num_set]
+            
+            # Escalar variables numéricas: estandarización en float32 sobre un único buffer
+            # (equivalente a StandardScaler)
+            X_num = df_clean[numeric_cols].to_numpy(dtype=np.float32, copy=True)
+            if numeric_cols:
+                mu = X_num.mean(axis=0)
+                sd = X_num.std(axis=0)
+                sd[sd == 0] = 1.0
+                X_num -= mu
+                X_num /= sd
+            
+            # Codificar variables categóricas (códigos de pandas, sin pasar por str)
+            le_dict = {}  # {columna: {código: etiqueta}} para decodificar
+            X_cat = np.empty((len(df_clean), len(cat_cols)), dtype=np.float32)
+            for j, col in enumerate(cat_cols):
+                cats = df_clean[col].astype('category')
+                X_cat[:, j] = cats.cat.codes.to_numpy()
+                le_dict[col] = dict(enumerate(cats.cat.categories))
+            
+            # Matriz final float32 contigua; el orden de predictores sigue al de las columnas de X
+            X = np.concatenate([X_num, X_cat, df_clean[other_cols].to_numpy(dtype=np.float32)], axis=1)
+            predictors = numeric_cols + cat_cols + other_cols
+            
+            # Entradas contiguas en C y etiquetas int8: sklearn no vuelve a convertir ni copiar en fit()
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            if len(class_names) <= np.iinfo(np.int8).max:
+                y = y.astype(np.int8, copy=False)
+            
             # Dividir en entrenamiento y prueba
             # Si hay muy pocos datos de una clase, no usar stratify para evitar errores
             if min_class_count >= 2:  # Necesitamos al menos 2 de cada clase para stratify
@@ -5435,31 +5467,31 @@ class AnalysisAndVisualization:
                 warnings.warn(f"Minority class has only {min_class_count} observation(s). Cannot use stratification.")
                 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42, stratify=None)
             
-            # Verificar que después del split hay al menos 2 clases en ambos conjuntos
-            unique_classes_train = np.unique(y_train)
-            unique_classes_test = np.unique(y_test)
-            
             # Calcular distribución de clases en entrenamiento y prueba para logging y resultados
-            train_class_counts = np.bincount(y_train)
-            test_class_counts = np.bincount(y_test)
+            # (minlength alinea los conteos con class_names aunque una clase falte en el split)
+            train_class_counts = np.bincount(y_train, minlength=len(class_names))
+            test_class_counts = np.bincount(y_test, minlength=len(class_names))
+            
+            # Verificar que después del split hay al menos 2 clases en ambos conjuntos
+            unique_classes_train = np.nonzero(train_class_counts)[0]
+            unique_classes_test = np.nonzero(test_class_counts)[0]
             
             # Mapear clases numéricas a nombres (0 = Normal, 1 = Outlier típicamente)
-            class_names = le_target.classes_
-            train_class_distribution = {}
-            test_class_distribution = {}
-            for i, class_name in enumerate(class_names):
-                train_class_distribution[str(class_name)] = int(train_class_counts[i]) if i < len(train_class_counts) else 0
-                test_class_distribution[str(class_name)] = int(test_class_counts[i]) if i < len(test_class_counts) else 0
-            
-            print(f"  Total observaciones: {len(df_clean)}")
-            for i, class_name in enumerate(class_names):
-                print(f"  {class_name}: {class_counts[i]}")
-            print(f"  Entrenamiento ({len(X_train)} observaciones):")
-            for class_name, count in train_class_distribution.items():
-                print(f"    {class_name}: {count}")
-            print(f"  Prueba ({len(X_test)} observaciones):")
-            for class_name, count in test_class_distribution.items():
-                print(f"    {class_name}: {count}")
+            class_labels = [str(class_name) for class_name in class_names]
+            train_class_distribution = dict(zip(class_labels, train_class_counts.tolist()))
+            test_class_distribution = dict(zip(class_labels, test_class_counts.tolist()))
+            
+            # Diagnóstico: con el nivel por encima de DEBUG no se formatea nada
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("  Total observaciones: %d", len(df_clean))
+                for class_name, count in zip(class_labels, class_counts.tolist()):
+                    logger.debug("  %s: %d", class_name, count)
+                logger.debug("  Entrenamiento (%d observaciones):", len(X_train))
+                for class_name, count in train_class_distribution.items():
+                    logger.debug("    %s: %d", class_name, count)
+                logger.debug("  Prueba (%d observaciones):", len(X_test))
+                for class_name, count in test_class_distribution.items():
+                    logger.debug("    %s: %d", class_name, count)
             
             if len(unique_classes_train) < 2:
                 return {
@@ -5479,10 +5511,26 @@ class AnalysisAndVisualization:
                     "classes_in_test": [int(cls) for cls in unique_classes_test]
                 }
             
-            # Calcular parámetros de regularización según el tamaño del dataset
-            # Para evitar sobreajuste, especialmente en datasets pequeños
+            # Tamaño del conjunto de entrenamiento original: decide el modelo y su regularización.
+            # Se toma antes del sobremuestreo para que las filas sintéticas no cambien la elección
             n_samples = len(X_train)
             
+            # Sobremuestreo SMOTE de la clase minoritaria (solo en entrenamiento, nunca en prueba)
+            oversampling_method = None
+            if oversample_minority:
+                train_counts = np.bincount(y_train)
+                minority_train_count = int(train_counts.min())
+                if 2 <= minority_train_count < int(train_counts.max()):
+                    try:
+                        from imblearn.over_sampling import SMOTE
+                        k_neighbors = max(1, min(5, minority_train_count - 1))
+                        X_train, y_train = SMOTE(k_neighbors=k_neighbors, random_state=42).fit_resample(X_train, y_train)
+                        oversampling_method = "SMOTE"
+                    except ImportError:
+                        warnings.warn("imbalanced-learn no está instalado; se usa solo class_weight='balanced'.")
+            
+            # Calcular parámetros de regularización según el tamaño del dataset
+            # Para evitar sobreajuste, especialmente en datasets pequeños
             # Ajustar max_depth según el tamaño del dataset
             # Para datasets pequeños (< 50), usar max_depth más conservador
             if n_samples < 20:
@@ -5505,57 +5553,98 @@ class AnalysisAndVisualization:
             # Ajustar n_estimators según el tamaño del dataset
             n_estimators = min(100, max(50, n_samples // 2))
             
-            # Entrenar Random Forest con parámetros de regularización
-            rf = RandomForestClassifier(
-                n_estimators=n_estimators,
-                random_state=42,
-                max_depth=max_depth,
-                min_samples_split=min_samples_split,
-                min_samples_leaf=min_samples_leaf,
-                max_features='sqrt',  # Usar sqrt de features para más regularización
-                class_weight='balanced'  # Balancear clases si hay desbalance
-            )
-            rf.fit(X_train, y_train)
+            # Para datasets medianos/grandes se usa HistGradientBoosting (binning en histogramas,
+            # mucho más rápido); para datasets pequeños el binning no compensa y se usa Random Forest
+            if n_samples > 200:
+                model_type = "Histogram Gradient Boosting"
+                # Hiperparámetros propios del boosting (no los del Random Forest): árboles pequeños
+                # limitados por número de hojas, tasa de aprendizaje moderada y regularización L2.
+                # sklearn activa la parada temprana automática a partir de 10 000 muestras
+                model_params = {
+                    "max_iter": 200,
+                    "learning_rate": 0.1,
+                    "max_leaf_nodes": 15,
+                    "min_samples_leaf": 20,
+                    "l2_regularization": 1.0
+                }
+                model = HistGradientBoostingClassifier(
+                    **model_params,
+                    class_weight='balanced',
+                    random_state=42
+                )
+            else:
+                # Entrenar Random Forest con parámetros de regularización
+                # Con pocos datos cada árbol usa todas las muestras del bootstrap para no perder precisión
+                model_type = "Random Forest"
+                max_samples = 0.8 if n_samples >= 30 else None
+                model = RandomForestClassifier(
+                    n_estimators=n_estimators,
+                    random_state=42,
+                    max_depth=max_depth,
+                    min_samples_split=min_samples_split,
+                    min_samples_leaf=min_samples_leaf,
+                    max_features='sqrt',  # Usar sqrt de features para más regularización
+                    class_weight='balanced',  # Balancear clases si hay desbalance
+                    bootstrap=True,
+                    max_samples=max_samples,  # Cada árbol ve un subconjunto de filas
+                    n_jobs=-1  # Entrenar y predecir árboles en paralelo
+                )
+                model_params = {
+                    "n_estimators": n_estimators,
+                    "max_depth": max_depth,
+                    "min_samples_split": min_samples_split,
+                    "min_samples_leaf": min_samples_leaf
+                }
+            model.fit(X_train, y_train)
+            if hasattr(model, 'n_iter_'):
+                model_params["n_iter"] = int(model.n_iter_)
             
-            # Predicciones
-            y_pred = rf.predict(X_test)
-            y_pred_proba = rf.predict_proba(X_test)[:, 1]
+            # Predicciones: un único recorrido del modelo; predict() equivale al argmax de predict_proba()
+            proba = model.predict_proba(X_test)
+            y_pred_proba = proba[:, 1]
+            y_pred = np.argmax(proba, axis=1)
             
             # Métricas
-            from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-            
-            auc_score = roc_auc_score(y_test, y_pred_proba)
-            cm = confusion_matrix(y_test, y_pred)
-            tn, fp, fn, tp = cm.ravel()
-            
-            # Calcular métricas adicionales
-            accuracy = accuracy_score(y_test, y_pred)
-            precision = precision_score(y_test, y_pred, zero_division=0)
-            recall = recall_score(y_test, y_pred, zero_division=0)
-            f1 = f1_score(y_test, y_pred, zero_division=0)
-            
-            # Curva ROC
+            # Curva ROC (una sola ordenación de las probabilidades; el AUC se integra sobre ella)
             fpr, tpr, roc_thresholds = roc_curve(y_test, y_pred_proba)
+            auc_score = auc(fpr, tpr)
+            cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
+            tn, fp, fn, tp = (int(v) for v in cm.ravel())
+            
+            # Calcular métricas adicionales a partir de la matriz de confusión (zero_division=0)
+            accuracy = (tp + tn) / (tn + fp + fn + tp)
+            precision = tp / (tp + fp) if (tp + fp) else 0.0
+            recall = tp / (tp + fn) if (tp + fn) else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
             
             # Limpiar valores infinitos y NaN de la curva ROC para JSON
             # Los thresholds pueden tener valores inf, necesitamos limpiarlos
-            fpr_clean = [float(x) if np.isfinite(x) else 0.0 for x in fpr]
-            tpr_clean = [float(x) if np.isfinite(x) else 0.0 for x in tpr]
-            # Para thresholds, reemplazar inf con valores extremos pero finitos
-            thresholds_clean = []
-            for x in roc_thresholds:
-                if np.isinf(x) and x > 0:
-                    thresholds_clean.append(1.0)  # Infinito positivo -> 1.0
-                elif np.isinf(x) and x < 0:
-                    thresholds_clean.append(0.0)  # Infinito negativo -> 0.0
-                elif np.isfinite(x):
-                    thresholds_clean.append(float(x))
-                else:
-                    thresholds_clean.append(0.0)  # NaN -> 0.0
+            fpr_clean = np.where(np.isfinite(fpr), fpr, 0.0).astype(float).tolist()
+            tpr_clean = np.where(np.isfinite(tpr), tpr, 0.0).astype(float).tolist()
+            # Para thresholds: +inf -> 1.0, -inf -> 0.0, NaN -> 0.0
+            thresholds_clean = np.nan_to_num(
+                np.asarray(roc_thresholds, dtype=float), nan=0.0, posinf=1.0, neginf=0.0
+            ).tolist()
             
             # Importancia de variables
-            feature_importance = list(zip(predictors, rf.feature_importances_))
-            feature_importance.sort(key=lambda x: x[1], reverse=True)
+            # HistGradientBoosting no expone feature_importances_: usar importancia por permutación
+            # sobre el conjunto de prueba, recortada a >= 0 y normalizada para sumar 1 como la
+            # importancia por impureza de Random Forest (importance_type indica cuál se usó)
+            if hasattr(model, 'feature_importances_'):
+                importance_type = "impurity"
+                importances = model.feature_importances_
+                order = np.argsort(-importances, kind='stable')
+            else:
+                importance_type = "permutation"
+                raw_importances = permutation_importance(
+                    model, X_test, y_test, n_repeats=5, random_state=42
+                ).importances_mean
+                # El orden se toma de las puntuaciones sin recortar (distingue las negativas)
+                order = np.argsort(-raw_importances, kind='stable')
+                importances = np.clip(raw_importances, 0.0, None)
+                total = importances.sum()
+                importances = importances / total if total > 0 else importances
+            feature_importance = list(zip(np.asarray(predictors)[order].tolist(), importances[order].tolist()))
             
             # Detectar posible sobreajuste (métricas perfectas)
             overfitting_warning = None
@@ -5568,29 +5657,27 @@ class AnalysisAndVisualization:
                     "(3) Validar el modelo con datos independientes."
                 )
             
-            return {
+            result = {
                 "success": True,
-                "model_type": "Random Forest",
-                "auc_score": float(auc_score) if np.isfinite(auc_score) else None,
-                "accuracy": float(accuracy) if np.isfinite(accuracy) else None,
-                "precision": float(precision) if np.isfinite(precision) else None,
-                "recall": float(recall) if np.isfinite(recall) else None,
-                "f1_score": float(f1) if np.isfinite(f1) else None,
+                "model_type": model_type,
+                "auc_score": float(auc_score) if isfinite(auc_score) else None,
+                "accuracy": float(accuracy) if isfinite(accuracy) else None,
+                "precision": float(precision) if isfinite(precision) else None,
+                "recall": float(recall) if isfinite(recall) else None,
+                "f1_score": float(f1) if isfinite(f1) else None,
                 "overfitting_warning": overfitting_warning,
                 "model_params": {
-                    "n_estimators": n_estimators,
-                    "max_depth": max_depth,
-                    "min_samples_split": min_samples_split,
-                    "min_samples_leaf": min_samples_leaf,
+                    **model_params,
                     "training_samples": len(X_train),
-                    "test_samples": len(X_test)
+                    "test_samples": len(X_test),
+                    "oversampling": oversampling_method
                 },
                 "confusion_matrix": {
                     "true_negatives": int(tn),
                     "false_positives": int(fp),
                     "false_negatives": int(fn),
                     "true_positives": int(tp),
-                    "matrix": cm.tolist()  # Matriz completa para visualización
+                    "matrix": [[tn, fp], [fn, tp]]  # Matriz completa para visualización
                 },
                 "roc_curve": {
                     "fpr": fpr_clean,
@@ -5601,19 +5688,26 @@ class AnalysisAndVisualization:
                     {"variable": var, "importance": float(imp)} 
                     for var, imp in feature_importance
                 ],
+                "importance_type": importance_type,
                 "training_size": len(X_train),
                 "test_size": len(X_test),
-                "interpretation": self._interpret_predictive_model(auc_score, feature_importance[:5])
+                "interpretation": self._interpret_predictive_model(auc_score, feature_importance[:5], model_type)
             }
             
+            # Guardar en caché (LRU acotado)
+            self._pred_model_cache[cache_key] = copy.deepcopy(result)
+            if len(self._pred_model_cache) > self._pred_model_cache_max_size:
+                self._pred_model_cache.popitem(last=False)
+            
+            return result
+            
         except Exception as e:
-            import traceback
             error_trace = traceback.format_exc()
             return {"error": f"Error en modelo predictivo: {str(e)}"}
     
-    def _interpret_predictive_model(self, auc_score: float, top_features: List[Tuple]) -> str:
+    def _interpret_predictive_model(self, auc_score: float, top_features: List[Tuple], model_type: str = "Random Forest") -> str:
         """Interpreta los resultados del modelo predictivo"""
-        interpretation = f"El modelo Random Forest alcanzó un AUC-ROC de {auc_score:.3f}. "
+        interpretation = f"El modelo {model_type} alcanzó un AUC-ROC de {auc_score:.3f}. "
         
         if auc_score >= 0.9:
             interpretation += "Excelente capacidad predictiva. "
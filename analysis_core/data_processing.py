@@ -5,16 +5,122 @@ from typing import Dict, List, Any, Tuple, Optional
 import json
 import os
 import math
-import time
-import chardet
+import codecs
 import logging
 import shutil
+import zipfile
+import hashlib
+import heapq
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 
+# Serializador JSON rápido (opcional); si no está instalado se usa el módulo json estándar
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# pyarrow (opcional): lector CSV multihilo y formato Parquet para el caché en disco de
+# DataFrames; si no está disponible se usa el motor de pandas y pickle respectivamente
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# polars (opcional): lector CSV multihilo en Rust; su conversión a pandas requiere pyarrow
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+# xlsxwriter (opcional): escritor de Excel más rápido que openpyxl; sin él pandas usa openpyxl
+try:
+    import xlsxwriter  # noqa: F401
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+# numba (opcional): compila los kernels de máscara de outliers para bloques numéricos grandes
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    prange = range
+    NUMBA_AVAILABLE = False
+
+# Marcadores que pandas interpreta como NaN por defecto; polars no los reconoce sin indicárselos
+_CSV_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+                  "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+                  "nan", "null"]
+
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
 
+# Celdas a partir de las cuales las máscaras de outliers se calculan con los kernels de numba
+_NUMBA_MIN_CELLS = 1_000_000
+
+# Columnas a partir de las cuales los duplicados de un bloque numérico homogéneo se buscan
+# ordenando filas como bytes (con pocas columnas la tabla hash de pandas es más rápida)
+_DUPLICATES_FAST_PATH_MIN_COLUMNS = 16
+
+
+def _bounds_mask_kernel(values, lower, upper):
+    """Filas con todos sus valores dentro de [lower, upper] (NaN cuenta como fuera)."""
+    n_rows, n_cols = values.shape
+    mask = np.ones(n_rows, dtype=np.bool_)
+    for j in range(n_cols):
+        lo = lower[j]
+        hi = upper[j]
+        for i in prange(n_rows):
+            v = values[i, j]
+            mask[i] &= (v >= lo) & (v <= hi)
+    return mask
+
+
+def _zscore_mask_kernel(values, means, stds, threshold):
+    """Filas con |z| < threshold en todas las columnas (NaN cuenta como fuera)."""
+    n_rows, n_cols = values.shape
+    mask = np.ones(n_rows, dtype=np.bool_)
+    for j in range(n_cols):
+        mean = means[j]
+        std = stds[j]
+        for i in prange(n_rows):
+            mask[i] &= abs((values[i, j] - mean) / std) < threshold
+    return mask
+
+
+if NUMBA_AVAILABLE:
+    # Sin fastmath: las comparaciones con NaN deben seguir dando False. error_model='numpy'
+    # para que la división por una desviación nula dé inf/NaN como en NumPy
+    _bounds_mask_kernel = njit(parallel=True, cache=True)(_bounds_mask_kernel)
+    _zscore_mask_kernel = njit(parallel=True, cache=True, error_model='numpy')(_zscore_mask_kernel)
+
+
+def _rows_within_bounds(values: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Máscara de filas sin outliers por límites; usa numba en bloques grandes si está disponible."""
+    if NUMBA_AVAILABLE and values.size >= _NUMBA_MIN_CELLS:
+        return _bounds_mask_kernel(values, lower, upper)
+    return ((values >= lower) & (values <= upper)).all(axis=1)
+
+
+def _rows_within_zscore(values: np.ndarray, means: np.ndarray, stds: np.ndarray,
+                        threshold: float = 3) -> np.ndarray:
+    """Máscara de filas con |z| < threshold; modifica ``values`` in-place en la ruta NumPy."""
+    if NUMBA_AVAILABLE and values.size >= _NUMBA_MIN_CELLS:
+        return _zscore_mask_kernel(values, means, stds, threshold)
+    # z-scores calculados in-place sobre el bloque (sin matrices intermedias)
+    values -= means
+    values /= stds
+    np.abs(values, out=values)
+    return (values < threshold).all(axis=1)
+
 # Versión del esquema de datos
 DATA_SCHEMA_VERSION = "1.0"
 
@@ -33,6 +139,28 @@ DATASET_SCHEMA = {
     "required": ["filename", "file_path"]
 }
 
+def _json_dumps(data: Any) -> bytes:
+    """Serializar a JSON UTF-8 indentado (orjson si está disponible)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            data,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+
+
+def _json_loads(raw: bytes) -> Any:
+    """Deserializar JSON (orjson si está disponible, con respaldo a json para archivos con NaN/Infinity)."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # Archivos escritos por json estándar pueden contener NaN/Infinity, que orjson rechaza
+            pass
+    return json.loads(raw.decode('utf-8'))
+
+
 class DataProcessor:
     """
     Clase para el procesamiento de datos con optimizaciones de rendimiento.
@@ -44,7 +172,8 @@ class DataProcessor:
     """
     
     def __init__(self, cache_dataframes: bool = True, max_cache_size_mb: int = 500, 
-                 enable_backups: bool = True, max_backups: int = 10):
+                 enable_backups: bool = True, max_backups: int = 10,
+                 df_cache_dir: Optional[str] = None):
         """
         Inicializar procesador de datos.
         
@@ -53,12 +182,16 @@ class DataProcessor:
             max_cache_size_mb: Tamaño máximo del caché en MB antes de limpiar.
             enable_backups: Si True, crea backups automáticos antes de guardar.
             max_backups: Número máximo de backups a mantener.
+            df_cache_dir: Directorio del caché en disco de DataFrames parseados. Por defecto,
+                ``df_cache`` junto al archivo de datasets.
         """
         self.datasets = {}
         self.datasets_file = "data/datasets.json"
         self.backups_dir = "data/backups"
+        self.df_cache_dir = df_cache_dir or os.path.join(os.path.dirname(self.datasets_file), "df_cache")
         self.enable_backups = enable_backups
         self.max_backups = max_backups
+        self._saved_datasets_digest: Optional[Tuple[str, bytes]] = None  # (ruta, huella) del último guardado
         
         # Crear directorio de backups si no existe
         if self.enable_backups:
@@ -69,9 +202,85 @@ class DataProcessor:
         # Sistema de caché para DataFrames
         self.cache_dataframes = cache_dataframes
         self.max_cache_size_mb = max_cache_size_mb
-        self._dataframe_cache = {}  # {filename: DataFrame}
-        self._cache_timestamps = {}  # {filename: timestamp} para invalidación
-        self._statistics_cache = {}  # {filename: statistics} para evitar recálculos
+        self._dataframe_cache = OrderedDict()  # {filename: DataFrame} en orden LRU (más reciente al final)
+        self._cache_bytes = 0  # Bytes ocupados por los DataFrames en caché
+        self._cache_sizes: Dict[str, int] = {}  # {filename: bytes estimados al insertarlo}
+        self._statistics_cache = {}  # {filename: (huella, statistics)} para evitar recálculos
+        self._encoding_cache: Dict[Tuple[str, int, int], str] = {}  # {(ruta, mtime_ns, tamaño): encoding}
+        self._parallel_stats_min_rows = 100_000  # Filas a partir de las cuales se usan hilos en estadísticas
+        self._processed_frames = OrderedDict()  # {(filename, huella de pasos): [DataFrame, bytes, estadísticas]} por prefijo
+        self._processed_frames_max_size = 8
+        self._processed_frames_max_mb = max(1, max_cache_size_mb // 4)  # Presupuesto de memoria de los prefijos
+        self._dataset_versions: Dict[str, int] = {}  # {filename: versión} incrementada en cada cambio en memoria
+    
+    def _disk_cache_path(self, file_path: str) -> Tuple[str, str]:
+        """
+        Calcular la ruta del caché en disco de un archivo fuente.
+        
+        La clave combina ruta, fecha de modificación y tamaño, de modo que el caché
+        se invalida automáticamente cuando el archivo original cambia.
+        
+        Returns:
+            Tupla con (prefijo de la ruta fuente, ruta completa del archivo de caché)
+        """
+        stat = os.stat(file_path)
+        path_key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=8).hexdigest()
+        stamp_key = hashlib.blake2b(f"{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'), digest_size=8).hexdigest()
+        extension = "parquet" if PYARROW_AVAILABLE else "pkl"
+        return path_key, os.path.join(self.df_cache_dir, f"{path_key}_{stamp_key}.{extension}")
+    
+    def _load_from_disk_cache(self, file_path: str) -> Optional[pd.DataFrame]:
+        """Cargar el DataFrame ya parseado desde el caché en disco, o None si no existe o está obsoleto."""
+        try:
+            _, cache_path = self._disk_cache_path(file_path)
+            if not os.path.exists(cache_path):
+                return None
+            if PYARROW_AVAILABLE:
+                # Parquet no conserva el dtype de cadenas Arrow con NaN: se vuelve a aplicar
+                return self._convert_text_columns_to_arrow(pd.read_parquet(cache_path, engine='pyarrow'))
+            return pd.read_pickle(cache_path)
+        except Exception as e:
+            logger.warning(f"No se pudo leer el caché en disco para '{file_path}': {e}")
+            return None
+    
+    def remove_from_disk_cache(self, file_path: str):
+        """
+        Eliminar todas las entradas del caché en disco de un archivo fuente.
+        
+        Se llama al borrar o reemplazar un dataset para que el directorio de caché no
+        acumule entradas de archivos que ya no existen.
+        
+        Args:
+            file_path: Ruta del archivo fuente del dataset.
+        """
+        if not os.path.isdir(self.df_cache_dir):
+            return
+        path_key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=8).hexdigest()
+        try:
+            for entry in os.listdir(self.df_cache_dir):
+                if entry.startswith(path_key + "_"):
+                    os.remove(os.path.join(self.df_cache_dir, entry))
+        except OSError as e:
+            logger.warning(f"No se pudo limpiar el caché en disco para '{file_path}': {e}")
+    
+    def _save_to_disk_cache(self, file_path: str, df: pd.DataFrame):
+        """Guardar el DataFrame parseado en el caché en disco, eliminando versiones obsoletas."""
+        try:
+            path_key, cache_path = self._disk_cache_path(file_path)
+            os.makedirs(self.df_cache_dir, exist_ok=True)
+            
+            # Eliminar cachés de versiones anteriores del mismo archivo fuente
+            for entry in os.listdir(self.df_cache_dir):
+                if entry.startswith(path_key + "_"):
+                    os.remove(os.path.join(self.df_cache_dir, entry))
+            
+            if PYARROW_AVAILABLE:
+                # Parquet columnar comprimido con zstd: conserva dtypes (incluido category)
+                df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+            else:
+                df.to_pickle(cache_path)
+        except Exception as e:
+            logger.warning(f"No se pudo escribir el caché en disco para '{file_path}': {e}")
     
     def validate_dataset_schema(self, dataset: Dict[str, Any]) -> bool:
         """
@@ -126,8 +335,8 @@ class DataProcessor:
             if os.path.exists(self.datasets_file):
                 # Intentar cargar el archivo principal
                 try:
-                    with open(self.datasets_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
+                    with open(self.datasets_file, 'rb') as f:
+                        data = _json_loads(f.read())
                     
                     # Validar versión del esquema si existe
                     schema_version = data.get("_schema_version", "0.0")
@@ -185,9 +394,13 @@ class DataProcessor:
             backup_filename = f"datasets_backup_{timestamp}.json"
             backup_path = os.path.join(self.backups_dir, backup_filename)
             
-            # Copiar archivo
+            # Copiar archivo y verificar la copia comparando el hash BLAKE2b de origen y destino
+            source_digest = self._file_digest(self.datasets_file)
             shutil.copy2(self.datasets_file, backup_path)
-            
+            if self._file_digest(backup_path) != source_digest:
+                os.remove(backup_path)
+                logger.error(f"El backup {backup_path} no coincide con el original; se descarta")
+                return None
             
             # Limpiar backups antiguos
             self._cleanup_old_backups()
@@ -197,21 +410,47 @@ class DataProcessor:
             logger.error(f"Error creando backup: {e}")
             return None
     
+    def _file_digest(self, file_path: str) -> bytes:
+        """Calcular el hash BLAKE2b de un archivo leyéndolo por bloques."""
+        with open(file_path, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+                return hashlib.file_digest(f, 'blake2b').digest()
+            digest = hashlib.blake2b()
+            buffer = memoryview(bytearray(1 << 20))
+            while True:
+                n_bytes = f.readinto(buffer)
+                if not n_bytes:
+                    break
+                digest.update(buffer[:n_bytes])
+            return digest.digest()
+    
+    def _list_backups(self) -> List[Tuple[str, float]]:
+        """
+        Listar los archivos de backup con su fecha de modificación.
+        
+        os.scandir reutiliza la información del directorio, evitando un stat adicional
+        por archivo en la mayoría de sistemas de archivos.
+        
+        Returns:
+            Lista de tuplas (ruta, mtime)
+        """
+        with os.scandir(self.backups_dir) as entries:
+            return [
+                (entry.path, entry.stat().st_mtime) for entry in entries
+                if entry.name.startswith("datasets_backup_") and entry.name.endswith(".json")
+            ]
+    
     def _cleanup_old_backups(self):
         """Eliminar backups antiguos manteniendo solo los más recientes"""
         try:
-            backup_files = []
-            for filename in os.listdir(self.backups_dir):
-                if filename.startswith("datasets_backup_") and filename.endswith(".json"):
-                    filepath = os.path.join(self.backups_dir, filename)
-                    backup_files.append((filepath, os.path.getmtime(filepath)))
+            backup_files = self._list_backups()
             
-            # Ordenar por fecha de modificación (más reciente primero)
-            backup_files.sort(key=lambda x: x[1], reverse=True)
-            
-            # Eliminar backups antiguos
+            # Eliminar backups antiguos (solo se seleccionan los N más recientes, sin ordenar todo)
             if len(backup_files) > self.max_backups:
-                for filepath, _ in backup_files[self.max_backups:]:
+                keep = {filepath for filepath, _ in heapq.nlargest(self.max_backups, backup_files, key=itemgetter(1))}
+                for filepath, _ in backup_files:
+                    if filepath in keep:
+                        continue
                     try:
                         os.remove(filepath)
                     except Exception as e:
@@ -227,26 +466,24 @@ class DataProcessor:
             True si la restauración fue exitosa
         """
         try:
-            backup_files = []
-            for filename in os.listdir(self.backups_dir):
-                if filename.startswith("datasets_backup_") and filename.endswith(".json"):
-                    filepath = os.path.join(self.backups_dir, filename)
-                    backup_files.append((filepath, os.path.getmtime(filepath)))
+            backup_files = self._list_backups()
             
             if not backup_files:
                 logger.warning("No se encontraron backups para restaurar")
                 return False
             
             # Obtener el backup más reciente
-            backup_files.sort(key=lambda x: x[1], reverse=True)
-            latest_backup = backup_files[0][0]
+            latest_backup = max(backup_files, key=itemgetter(1))[0]
             
             # Restaurar
             shutil.copy2(latest_backup, self.datasets_file)
+            self._saved_datasets_digest = None
             logger.info(f"Restaurado desde backup: {latest_backup}")
             
-            # Recargar datasets
+            # Recargar datasets (los metadatos de todos pueden haber cambiado)
             self.load_datasets()
+            for filename in list(self.datasets):
+                self._mark_dataset_changed(filename)
             return True
         except Exception as e:
             logger.error(f"Error restaurando desde backup: {e}")
@@ -260,9 +497,21 @@ class DataProcessor:
         1. Validación de esquema antes de guardar
         2. Backup automático antes de escribir
         3. Escritura atómica (escribe a archivo temporal y luego renombra)
-        4. Validación del archivo guardado
+        4. Validación del archivo guardado (tamaño escrito frente al buffer serializado)
+        
+        Los datasets se serializan una sola vez: ese buffer da la huella del contenido y es
+        el que se escribe. Si los datasets no cambiaron desde el último guardado en el mismo
+        archivo (misma huella), no se valida, ni se hace backup, ni se escribe.
         """
         try:
+            # Omitir guardados sin cambios (varios pasos de un mismo flujo de la UI guardan seguido)
+            datasets_buffer = _json_dumps(self.datasets)
+            digest = hashlib.blake2b(datasets_buffer, digest_size=16).digest()
+            if (self._saved_datasets_digest == (self.datasets_file, digest)
+                    and os.path.exists(self.datasets_file)):
+                logger.debug("Datasets sin cambios desde el último guardado; se omite la escritura")
+                return
+            
             # Validar todos los datasets antes de guardar
             all_valid, errors = self.validate_all_datasets()
             if not all_valid:
@@ -278,32 +527,40 @@ class DataProcessor:
             os.makedirs(os.path.dirname(self.datasets_file), exist_ok=True)
             
             # Preparar datos con metadatos de versión
-            data_to_save = {
+            metadata_buffer = _json_dumps({
                 "_schema_version": DATA_SCHEMA_VERSION,
-                "_last_modified": datetime.now().isoformat(),
-                **self.datasets
-            }
+                "_last_modified": datetime.now().isoformat()
+            })
             
             # Escritura atómica: escribir a archivo temporal primero
             temp_file = self.datasets_file + ".tmp"
             
             try:
                 # Escribir a archivo temporal
-                with open(temp_file, 'w', encoding='utf-8') as f:
-                    json.dump(data_to_save, f, ensure_ascii=False, indent=2, default=str)
-                
-                # Validar que el archivo temporal es JSON válido
-                with open(temp_file, 'r', encoding='utf-8') as f:
-                    json.load(f)  # Si hay error, lanzará excepción
-                
-                # Si todo está bien, reemplazar el archivo original
-                # En Windows, necesitamos eliminar el archivo original primero
-                if os.path.exists(self.datasets_file):
-                    os.remove(self.datasets_file)
+                # Unir los metadatos y los datasets ya serializados en un único objeto JSON:
+                # ambos buffers tienen indentación 2, así que basta con empalmar las claves de
+                # primer nivel (mismo resultado que serializar {**metadatos, **datasets})
+                if datasets_buffer == b'{}':
+                    buffer = metadata_buffer
+                else:
+                    buffer = metadata_buffer[:-2] + b',\n' + datasets_buffer[2:]
+                with open(temp_file, 'wb') as f:
+                    f.write(buffer)
+                    f.flush()
+                    os.fsync(f.fileno())
                 
-                # Renombrar archivo temporal a archivo final
-                os.rename(temp_file, self.datasets_file)
+                # Validar que el archivo temporal se escribió completo (sin volver a leerlo ni parsearlo)
+                written_size = os.path.getsize(temp_file)
+                if written_size != len(buffer):
+                    raise IOError(
+                        f"Escritura incompleta de {temp_file}: {written_size} de {len(buffer)} bytes"
+                    )
                 
+                # Si todo está bien, reemplazar el archivo original de forma atómica
+                # (os.replace sobrescribe el destino también en Windows, sin ventana en la
+                # que el archivo no exista)
+                os.replace(temp_file, self.datasets_file)
+                self._saved_datasets_digest = (self.datasets_file, digest)
                 
             except Exception as e:
                 # Si hay error, eliminar archivo temporal y restaurar desde backup
@@ -331,29 +588,48 @@ class DataProcessor:
     
     def safe_float(self, value):
         """Convertir valor a float de forma segura, manejando NaN"""
-        if pd.isna(value) or value is None or (isinstance(value, float) and math.isnan(value)):
+        # Atajo por tipo exacto: NaN es el único float distinto de sí mismo
+        value_type = type(value)
+        if value_type is float:
+            return None if value != value else value
+        if value_type is int:
+            return float(value)
+        if value is None:
             return None
+        # Resto de tipos (escalares numpy, strings, pd.NA/NaT -> TypeError)
         try:
-            return float(value)
+            result = float(value)
         except (ValueError, TypeError):
             return None
+        return None if result != result else result
     
     def safe_preview_data(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Convertir DataFrame a lista de diccionarios de forma segura, manejando NaN"""
-        preview_data = []
-        for _, row in df.iterrows():
-            safe_row = {}
-            for column, value in row.items():
-                if pd.isna(value) or value is None or (isinstance(value, float) and math.isnan(value)):
-                    safe_row[column] = None
-                else:
-                    # Convertir a string para evitar problemas de serialización
-                    safe_row[column] = str(value)
-            preview_data.append(safe_row)
-        return preview_data
+        columns = df.columns.to_list()
+        # Máscara de valores faltantes calculada una sola vez para todo el bloque
+        mask = df.notna().to_numpy()
+        try:
+            # Convertir a string para evitar problemas de serialización (columna a columna,
+            # conservando el tipo original de cada una); los faltantes se reemplazan por None
+            values = df.to_numpy(dtype=object).astype(str).astype(object)
+        except (TypeError, ValueError, MemoryError):
+            # Respaldo fila a fila (p. ej. celdas de texto muy largas, que inflan el arreglo
+            # de ancho fijo): tuplas simples, sin construir una Series por fila
+            return [
+                {column: (str(value) if present else None) for column, value, present in zip(columns, row, row_mask)}
+                for row, row_mask in zip(df.itertuples(index=False, name=None), mask)
+            ]
+        values[~mask] = None
+        return [dict(zip(columns, row)) for row in values.tolist()]
     
     def clean_for_json(self, obj):
         """Limpiar objeto para serialización JSON segura"""
+        # Atajo para los tipos primitivos más frecuentes (comparación de identidad, sin recorrer la MRO)
+        obj_type = type(obj)
+        if obj_type is str or obj_type is int or obj_type is bool:
+            return obj
+        if obj_type is float:
+            return None if math.isnan(obj) else obj
         if isinstance(obj, dict):
             return {key: self.clean_for_json(value) for key, value in obj.items()}
         elif isinstance(obj, list):
@@ -367,56 +643,136 @@ class DataProcessor:
     
     def clean_dataframe_for_json(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """Convertir DataFrame a lista de diccionarios limpiando valores NaN para JSON"""
-        records = df.to_dict('records')
-        return [self.clean_for_json(record) for record in records]
+        needs_cleaning = []
+        for j, (column, dtype) in enumerate(df.dtypes.items()):
+            if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+                continue
+            if isinstance(dtype, pd.StringDtype):
+                continue
+            if dtype == object and pd.api.types.infer_dtype(df.iloc[:, j], skipna=True) in ('string', 'empty'):
+                continue
+            needs_cleaning.append(j)
+        
+        # Solo números, booleanos y texto: polars construye los diccionarios en Rust, con los
+        # NaN ya convertidos en None (mismo resultado que la ruta de NumPy)
+        if (not needs_cleaning and POLARS_AVAILABLE and PYARROW_AVAILABLE and df.columns.is_unique
+                and all(isinstance(column, str) for column in df.columns)):
+            try:
+                return pl.from_pandas(df, include_index=False).to_dicts()
+            except Exception as e:
+                logger.debug(f"Conversión con polars falló, usando NumPy: {e}")
+        
+        # Una sola matriz de objetos con NaN -> None (numpy entrega int/float/bool nativos)
+        values = df.to_numpy(dtype=object, na_value=None)
+        for j in needs_cleaning:
+            # Fechas, categorías, objetos mixtos, etc.: limpiar valor a valor
+            values[:, j] = [self.clean_for_json(value) for value in values[:, j]]
+        columns = df.columns.to_list()
+        return [dict(zip(columns, row)) for row in values.tolist()]
     
     def classify_variable_type(self, series: pd.Series) -> str:
         """Clasificar el tipo de variable según metodología estadística"""
+        # Contar valores únicos en una sola pasada (NaN cuenta como valor, igual que unique())
+        n_unique = series.nunique(dropna=False)
+        
         # Verificar si es numérico
         if pd.api.types.is_numeric_dtype(series):
             # Verificar si es discreto (valores únicos limitados)
-            unique_ratio = len(series.unique()) / len(series)
+            unique_ratio = n_unique / len(series)
             if unique_ratio < 0.1:  # Menos del 10% de valores únicos
                 return "cuantitativa_discreta"
             else:
                 return "cuantitativa_continua"
         else:
             # Verificar si es binario
-            if len(series.unique()) == 2:
+            if n_unique == 2:
                 return "cualitativa_nominal_binaria"
             else:
                 return "cualitativa_nominal"
     
+    def classify_variable_types(self, df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, str]:
+        """
+        Clasificar varias columnas a la vez con el mismo criterio que ``classify_variable_type``.
+        
+        Los valores únicos se cuentan para todas las columnas en una sola llamada y la
+        clasificación se decide por dtype: numéricas según la proporción de únicos, el resto
+        según sean binarias o no.
+        
+        Args:
+            df: DataFrame con las columnas a clasificar.
+            columns: Columnas a clasificar (por defecto todas).
+        
+        Returns:
+            Diccionario {columna: tipo de variable}.
+        """
+        columns = list(df.columns) if columns is None else list(columns)
+        if not columns:
+            return {}
+        if not df.columns.is_unique:
+            return {column: self.classify_variable_type(df[column]) for column in columns}
+        
+        block = df[columns]
+        n_unique = block.nunique(dropna=False).to_numpy()
+        is_numeric = np.array([pd.api.types.is_numeric_dtype(dtype) for dtype in block.dtypes])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unique_ratio = n_unique / len(df)
+        
+        labels = np.where(
+            is_numeric,
+            np.where(unique_ratio < 0.1, "cuantitativa_discreta", "cuantitativa_continua"),
+            np.where(n_unique == 2, "cualitativa_nominal_binaria", "cualitativa_nominal"),
+        )
+        return dict(zip(columns, labels.tolist()))
+    
     def detect_file_encoding(self, file_path: str, sample_size: int = 10000) -> str:
         """
         Detecta el encoding de un archivo CSV.
         
+        Primero busca una marca BOM; si no la hay y la muestra es ASCII puro devuelve UTF-8
+        sin decodificar; si no, intenta decodificar la muestra como UTF-8 estricto y, si
+        falla, asume cp1252 (el encoding habitual de Excel en Windows). El resultado se
+        guarda en caché mientras el archivo no cambie (mtime y tamaño).
+        
         Args:
             file_path: Ruta al archivo CSV.
             sample_size: Número de bytes a leer para detectar encoding.
         
         Returns:
-            Nombre del encoding detectado (ej: 'utf-8', 'latin-1', 'cp1252').
+            Nombre del encoding detectado ('utf-8-sig', 'utf-32', 'utf-16', 'utf-8' o 'cp1252').
         
         Note:
             Si la detección falla, retorna 'utf-8' como fallback.
         """
         try:
+            stat = os.stat(file_path)
+            cache_key = (file_path, stat.st_mtime_ns, stat.st_size)
+            cached = self._encoding_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            
             with open(file_path, 'rb') as f:
                 sample = f.read(sample_size)
             
-            result = chardet.detect(sample)
-            encoding = result.get('encoding', 'utf-8')
-            confidence = result.get('confidence', 0)
-            
-            # Si la confianza es muy baja, usar utf-8 como fallback
-            if confidence < 0.5:
-                logger.warning(
-                    f"Confianza baja en detección de encoding ({confidence:.2%}). Usando utf-8 como fallback.",
-                    extra={'file_path': file_path, 'detected_encoding': encoding, 'confidence': confidence}
-                )
-                return 'utf-8'
+            # Marcas BOM: comprobación de tiempo constante (UTF-32 LE empieza igual que UTF-16 LE)
+            if sample.startswith(codecs.BOM_UTF8):
+                encoding = 'utf-8-sig'
+            elif sample.startswith((codecs.BOM_UTF32_LE, codecs.BOM_UTF32_BE)):
+                encoding = 'utf-32'
+            elif sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+                encoding = 'utf-16'
+            elif sample.isascii():
+                # Sin bytes con el bit alto activo: cualquier encoding compatible sirve
+                encoding = 'utf-8'
+            else:
+                # UTF-8 estricto; el decodificador incremental tolera un carácter multibyte
+                # cortado al final de la muestra
+                try:
+                    codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+                    encoding = 'utf-8'
+                except UnicodeDecodeError:
+                    encoding = 'cp1252'
             
+            self._encoding_cache[cache_key] = encoding
             return encoding
         except Exception as e:
             logger.warning(
@@ -425,6 +781,177 @@ class DataProcessor:
             )
             return 'utf-8'
     
+    def _read_csv(self, file_path: str, encoding: str) -> pd.DataFrame:
+        """
+        Leer un CSV omitiendo líneas mal formadas.
+        
+        Para archivos UTF-8 se intenta primero polars (lectura paralela en todos los núcleos),
+        si está instalado junto con pyarrow; después el lector multihilo de pyarrow, luego el
+        motor C de pandas y, si el tokenizador falla, el motor 'python', más tolerante.
+        
+        Args:
+            file_path: Ruta al archivo CSV.
+            encoding: Encoding con el que leer el archivo.
+        
+        Returns:
+            DataFrame con el contenido del archivo.
+        
+        Raises:
+            UnicodeDecodeError: Si el archivo no puede decodificarse con el encoding dado.
+        """
+        # polars solo decodifica UTF-8: con otros encodings se usa directamente pandas
+        if POLARS_AVAILABLE and PYARROW_AVAILABLE and encoding.lower().replace('-', '') in ('utf8', 'utf8sig', 'ascii'):
+            try:
+                return pl.read_csv(file_path, null_values=_CSV_NA_VALUES,
+                                   infer_schema_length=10000).to_pandas()
+            except Exception as e:
+                logger.debug(f"Lector polars falló para '{file_path}', usando pandas: {e}")
+        
+        if PYARROW_AVAILABLE:
+            try:
+                df = pd.read_csv(file_path, encoding=encoding, on_bad_lines='skip', engine='pyarrow')
+                return self._restore_temporal_text_columns(df, file_path, encoding)
+            except UnicodeDecodeError:
+                raise
+            except Exception as e:
+                logger.debug(f"Lector pyarrow falló para '{file_path}', usando motor C: {e}")
+        
+        # Motor C de pandas (admite on_bad_lines='skip'); el motor 'python' queda solo como
+        # último recurso para archivos que el tokenizador C no consigue interpretar.
+        # float_precision='round_trip': mismo redondeo exacto que polars, pyarrow y el motor python
+        try:
+            return pd.read_csv(file_path, encoding=encoding, on_bad_lines='skip', engine='c',
+                               float_precision='round_trip')
+        except UnicodeDecodeError:
+            raise
+        except (pd.errors.ParserError, ValueError) as e:
+            logger.debug(f"Motor C falló para '{file_path}', usando motor python: {e}")
+        return pd.read_csv(file_path, encoding=encoding, on_bad_lines='skip', engine='python')
+    
+    @staticmethod
+    def _restore_temporal_text_columns(df: pd.DataFrame, file_path: str, encoding: str) -> pd.DataFrame:
+        """
+        Devolver como texto las columnas que el lector de pyarrow interpretó como fechas u horas.
+        
+        El motor C de pandas y polars dejan esas columnas como cadenas; pyarrow infiere
+        timestamps, fechas y horas. Para que los dtypes (y con ellos la clasificación de
+        variables) no dependan de las librerías instaladas, solo esas columnas se vuelven a
+        leer con tipo string, conservando el texto original del archivo.
+        
+        Args:
+            df: DataFrame leído con el motor pyarrow.
+            file_path: Ruta al archivo CSV.
+            encoding: Encoding del archivo.
+        
+        Returns:
+            DataFrame con las columnas temporales como texto (object).
+        """
+        temporal_cols = [
+            column for column, dtype in df.dtypes.items()
+            if pd.api.types.is_datetime64_any_dtype(dtype)
+            or (dtype == object and pd.api.types.infer_dtype(df[column], skipna=True) in ('date', 'time', 'datetime'))
+        ]
+        if not temporal_cols:
+            return df
+        
+        table = pa_csv.read_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(encoding=encoding),
+            parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=temporal_cols,
+                column_types={column: pa.string() for column in temporal_cols},
+                null_values=_CSV_NA_VALUES,
+                strings_can_be_null=True
+            )
+        )
+        df = df.copy(deep=False)
+        for column in temporal_cols:
+            values = table.column(column).to_numpy(zero_copy_only=False).astype(object)
+            values[pd.isna(values)] = np.nan
+            df[column] = values
+        return df
+    
+    def _downcast_numeric_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reducir columnas int64 a int32 cuando su rango lo permite (sin pérdida).
+        
+        Reduce a la mitad la memoria y el ancho de banda de las columnas enteras. Las
+        estadísticas no cambian porque pandas acumula los enteros en float64. Las columnas
+        float64 no se reducen: float32 alteraría la precisión de medias y desviaciones.
+        
+        Args:
+            df: DataFrame recién cargado.
+        
+        Returns:
+            DataFrame con las columnas enteras reducidas.
+        """
+        int_cols = df.select_dtypes(include=['int64']).columns
+        if len(int_cols) == 0:
+            return df
+        
+        int32_info = np.iinfo(np.int32)
+        bounds = df[int_cols].agg(['min', 'max'])
+        fits = (bounds.loc['min'] >= int32_info.min) & (bounds.loc['max'] <= int32_info.max)
+        return df.astype({column: np.int32 for column in fits.index[fits.to_numpy()]})
+    
+    def _normalize_loaded_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Tratamiento común tras parsear un archivo: enteros reducidos y texto en Arrow.
+        
+        Lo aplican todas las rutas de lectura (carga completa y lectura parcial de la vista
+        previa) para que un mismo dataset muestre los mismos dtypes por cualquiera de ellas.
+        """
+        return self._convert_text_columns_to_arrow(self._downcast_numeric_columns(df))
+    
+    def _apply_category_columns(self, filename: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reaplicar las columnas ``category`` registradas en los metadatos del dataset.
+        
+        preprocess_data_types las registra en ``category_columns`` en lugar de escribirlas
+        en el caché en disco, de modo que una carga en frío y una en caliente devuelven los
+        mismos dtypes.
+        """
+        category_columns = {
+            column: 'category' for column in self.datasets.get(filename, {}).get("category_columns", [])
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype)
+        }
+        if not category_columns:
+            return df
+        return df.astype(category_columns)
+    
+    def _convert_text_columns_to_arrow(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Almacenar las columnas de texto como cadenas respaldadas por Arrow.
+        
+        Solo se aplica si pyarrow está instalado y a columnas object cuyos valores son todos
+        cadenas. Se usa la variante con NaN como faltante, de modo que comparaciones y
+        máscaras siguen devolviendo booleanos de NumPy; isna, nunique y value_counts pasan
+        a ejecutarse con los kernels de Arrow. Las columnas numéricas no cambian.
+        
+        Args:
+            df: DataFrame recién cargado.
+        
+        Returns:
+            DataFrame con las columnas de texto convertidas.
+        """
+        if not PYARROW_AVAILABLE:
+            return df
+        
+        text_cols = [
+            column for column, dtype in df.dtypes.items()
+            if dtype == object and pd.api.types.infer_dtype(df[column], skipna=True) == 'string'
+        ]
+        if not text_cols:
+            return df
+        
+        try:
+            string_dtype = pd.StringDtype(storage="pyarrow", na_value=np.nan)
+        except TypeError:
+            # pandas < 2.3
+            string_dtype = pd.StringDtype("pyarrow_numpy")
+        return df.astype({column: string_dtype for column in text_cols})
+    
     def validate_file_integrity(self, file_path: str, filename: str) -> Dict[str, Any]:
         """
         Valida la integridad de un archivo antes de procesarlo.
@@ -442,13 +969,14 @@ class DataProcessor:
         errors = []
         warnings = []
         
-        # Verificar que el archivo existe
-        if not os.path.exists(file_path):
+        # Verificar que el archivo existe y obtener su tamaño con una sola llamada a stat
+        try:
+            file_size = os.stat(file_path).st_size
+        except FileNotFoundError:
             errors.append(f"El archivo no existe: {file_path}")
             return {"valid": False, "errors": errors, "warnings": warnings}
         
         # Verificar que el archivo no esté vacío
-        file_size = os.path.getsize(file_path)
         if file_size == 0:
             errors.append("El archivo está vacío")
             return {"valid": False, "errors": errors, "warnings": warnings}
@@ -473,7 +1001,10 @@ class DataProcessor:
             # Para Excel, validar que sea un archivo ZIP válido (xlsx) o formato OLE (xls)
             try:
                 if filename.endswith('.xlsx'):
-                    import zipfile
+                    # is_zipfile solo lee la firma del directorio central; se abre el ZIP
+                    # únicamente si la firma es válida
+                    if not zipfile.is_zipfile(file_path):
+                        raise zipfile.BadZipFile(file_path)
                     with zipfile.ZipFile(file_path, 'r') as zip_file:
                         # Verificar que tenga la estructura básica de Excel
                         if 'xl/workbook.xml' not in zip_file.namelist():
@@ -510,40 +1041,45 @@ class DataProcessor:
         """
         try:
             # Validar integridad del archivo
-            logger.info(f"Validando integridad del archivo '{filename}'", extra={'filename': filename, 'file_path': file_path})
+            logger.info(f"Validando integridad del archivo '{filename}'", extra={'dataset_filename': filename, 'file_path': file_path})
             integrity_check = self.validate_file_integrity(file_path, filename)
             
             if not integrity_check["valid"]:
                 error_msg = f"Archivo inválido o corrupto: {', '.join(integrity_check['errors'])}"
-                logger.error(error_msg, extra={'filename': filename, 'errors': integrity_check['errors']})
+                logger.error(error_msg, extra={'dataset_filename': filename, 'errors': integrity_check['errors']})
                 raise ValueError(error_msg)
             
             # Mostrar advertencias si las hay
             if integrity_check["warnings"]:
                 for warning in integrity_check["warnings"]:
-                    logger.warning(f"Advertencia para '{filename}': {warning}", extra={'filename': filename, 'warning': warning})
+                    logger.warning(f"Advertencia para '{filename}': {warning}", extra={'dataset_filename': filename, 'warning': warning})
             
             # Leer dataset con detección de encoding para CSV
-            logger.info(f"Cargando dataset '{filename}'", extra={'filename': filename})
-            
-            if filename.endswith('.csv'):
+            logger.info(f"Cargando dataset '{filename}'", extra={'dataset_filename': filename})
+            
+            # Reutilizar el DataFrame ya parseado si el archivo no cambió desde la última lectura
+            df = self._load_from_disk_cache(file_path)
+            loaded_from_disk_cache = df is not None
+            if loaded_from_disk_cache:
+                logger.info(f"Dataset '{filename}' cargado desde caché en disco", extra={'dataset_filename': filename})
+            elif filename.endswith('.csv'):
                 # Detectar encoding automáticamente
                 encoding = self.detect_file_encoding(file_path)
-                logger.info(f"Usando encoding '{encoding}' para '{filename}'", extra={'filename': filename, 'encoding': encoding})
+                logger.info(f"Usando encoding '{encoding}' para '{filename}'", extra={'dataset_filename': filename, 'encoding': encoding})
                 
                 # Intentar cargar con el encoding detectado
                 try:
-                    df = pd.read_csv(file_path, encoding=encoding, on_bad_lines='skip', engine='python')
+                    df = self._read_csv(file_path, encoding)
                 except UnicodeDecodeError:
                     # Si falla, intentar con otros encodings comunes
                     logger.warning(
                         f"Error con encoding '{encoding}', intentando con otros encodings comunes",
-                        extra={'filename': filename, 'failed_encoding': encoding}
+                        extra={'dataset_filename': filename, 'failed_encoding': encoding}
                     )
                     for fallback_encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
                         try:
-                            df = pd.read_csv(file_path, encoding=fallback_encoding, on_bad_lines='skip', engine='python')
-                            logger.info(f"Cargado exitosamente con encoding '{fallback_encoding}'", extra={'filename': filename, 'encoding': fallback_encoding})
+                            df = self._read_csv(file_path, fallback_encoding)
+                            logger.info(f"Cargado exitosamente con encoding '{fallback_encoding}'", extra={'dataset_filename': filename, 'encoding': fallback_encoding})
                             break
                         except (UnicodeDecodeError, Exception):
                             continue
@@ -557,55 +1093,65 @@ class DataProcessor:
                     # Intentar con engine alternativo si falla
                     logger.warning(
                         f"Error cargando Excel con engine por defecto, intentando alternativo: {str(e)}",
-                        extra={'filename': filename, 'error': str(e)}
+                        extra={'dataset_filename': filename, 'error': str(e)}
                     )
                     try:
                         df = pd.read_excel(file_path, engine='xlrd' if filename.endswith('.xls') else 'openpyxl')
                     except Exception as excel_error:
                         error_msg = f"Error cargando archivo Excel '{filename}': {str(excel_error)}. El archivo puede estar corrupto."
-                        logger.error(error_msg, extra={'filename': filename, 'error': str(excel_error)}, exc_info=True)
+                        logger.error(error_msg, extra={'dataset_filename': filename, 'error': str(excel_error)}, exc_info=True)
                         raise ValueError(error_msg) from excel_error
             
             # Validar que el DataFrame no esté vacío
             if df.empty:
                 error_msg = f"El archivo '{filename}' está vacío o no contiene datos válidos"
-                logger.error(error_msg, extra={'filename': filename})
+                logger.error(error_msg, extra={'dataset_filename': filename})
                 raise ValueError(error_msg)
             
             # Validar que tenga columnas
             if len(df.columns) == 0:
                 error_msg = f"El archivo '{filename}' no tiene columnas válidas"
-                logger.error(error_msg, extra={'filename': filename})
+                logger.error(error_msg, extra={'dataset_filename': filename})
                 raise ValueError(error_msg)
             
+            if not loaded_from_disk_cache:
+                df = self._normalize_loaded_frame(df)
+                self._save_to_disk_cache(file_path, df)
+            
+            # Dimensiones y nombres de columnas calculados una sola vez
+            n_rows, n_cols = df.shape
+            col_names = df.columns.tolist()
+            
             logger.info(
-                f"Dataset '{filename}' cargado exitosamente: {len(df)} filas, {len(df.columns)} columnas",
-                extra={'filename': filename, 'rows': len(df), 'columns': len(df.columns)}
+                f"Dataset '{filename}' cargado exitosamente: {n_rows} filas, {n_cols} columnas",
+                extra={'dataset_filename': filename, 'rows': n_rows, 'columns': n_cols}
             )
             
             # Clasificar variables - preservar tipos existentes si ya están guardados
             existing_variable_types = self.datasets.get(filename, {}).get('variable_types', {})
             variable_types = {}
             
-            for column in df.columns:
-                # Si ya existe un tipo guardado para esta columna, usarlo
-                if column in existing_variable_types:
-                    variable_types[column] = existing_variable_types[column]
-                else:
-                    # Si no existe, clasificar automáticamente
-                    variable_types[column] = self.classify_variable_type(df[column])
+            # Clasificar automáticamente (en bloque) solo las columnas sin tipo guardado
+            auto_types = self.classify_variable_types(
+                df, [column for column in col_names if column not in existing_variable_types]
+            )
+            for column in col_names:
+                variable_types[column] = existing_variable_types.get(column, auto_types.get(column))
             
             # Verificar si existe la columna es_outlier en el dataset pero no en variable_types
             if 'es_outlier' in df.columns and 'es_outlier' not in variable_types:
                 variable_types['es_outlier'] = 'cualitativa_nominal_binaria'
             
+            # Contenido nuevo para este nombre: nueva versión antes de calcular las estadísticas
+            self._mark_dataset_changed(filename)
+            
             # Crear información del dataset
             dataset_info = {
                 "filename": filename,
                 "file_path": file_path,
-                "rows": len(df),
-                "columns": len(df.columns),
-                "column_names": list(df.columns),
+                "rows": n_rows,
+                "columns": n_cols,
+                "column_names": col_names,
                 "variable_types": variable_types,
                 "preview": self.safe_preview_data(df.head(10)),
                 "uploaded_at": pd.Timestamp.now().isoformat(),
@@ -624,7 +1170,7 @@ class DataProcessor:
             raise
         except Exception as e:
             error_msg = f"Error procesando dataset '{filename}': {str(e)}"
-            logger.error(error_msg, extra={'filename': filename, 'file_path': file_path, 'error': str(e)}, exc_info=True)
+            logger.error(error_msg, extra={'dataset_filename': filename, 'file_path': file_path, 'error': str(e)}, exc_info=True)
             raise Exception(error_msg) from e
     
     def get_summary_statistics(self, df: pd.DataFrame, variable_types: Dict[str, str], 
@@ -637,97 +1183,232 @@ class DataProcessor:
         Args:
             df: DataFrame con los datos.
             variable_types: Diccionario con tipos de variables.
-            filename: Nombre del archivo (opcional, para usar caché).
+            filename: Nombre del archivo (opcional, para usar caché). Con filename, ``df`` debe
+                ser el contenido actual del dataset: quien lo modifica registra el cambio con
+                _mark_dataset_changed antes de pedir las estadísticas.
             force_recalculate: Si True, fuerza el recálculo incluso si hay caché.
         
         Returns:
             Diccionario con estadísticas por variable.
         """
+        # Clave por versión del dataset (se incrementa en cada cambio) y tipos: comprobar el
+        # caché no recorre los datos
+        cache_key = None
+        if filename:
+            cache_key = (self._dataset_versions.get(filename, 0), tuple(df.columns), tuple(variable_types.items()))
+        
         # Verificar caché si hay filename y no se fuerza recálculo
-        if filename and not force_recalculate and filename in self._statistics_cache:
-            cached_stats = self._statistics_cache[filename]
-            # Verificar que las variables coinciden
-            if set(cached_stats.keys()) == set(variable_types.keys()):
+        if cache_key is not None and not force_recalculate and filename in self._statistics_cache:
+            cached_key, cached_stats = self._statistics_cache[filename]
+            if cached_key == cache_key:
                 return cached_stats.copy()
         
         summary = {}
         
-        print(f"Procesando estadísticas para {len(variable_types)} variables")
-        print(f"Columnas disponibles en DataFrame: {list(df.columns)}")
+        # Columnas cuantitativas almacenadas como enteros/reales: sus estadísticas salen de
+        # _numeric_stats (una sola máscara de NaN por columna en lugar de siete reducciones)
+        numeric_cols = [
+            column for column, var_type in variable_types.items()
+            if var_type in ["cuantitativa_continua", "cuantitativa_discreta"]
+            and column in df.columns
+            and df[column].dtype.kind in 'iuf'
+        ]
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Procesando estadísticas para %d variables", len(variable_types))
+            logger.debug("Columnas disponibles en DataFrame: %s", list(df.columns))
+        
+        # Las columnas son independientes entre sí y las reducciones de NumPy/pandas liberan
+        # el GIL, así que con datasets grandes se reparten entre hilos (el orden se conserva)
+        numeric_set = set(numeric_cols)
+        
+        def column_statistics(item: Tuple[str, str]) -> Dict[str, Any]:
+            column, var_type = item
+            if column in numeric_set:
+                return {"type": var_type, **self._numeric_stats(df[column])}
+            return self._compute_column_statistics(df[column], var_type)
+        
+        present = [(column, var_type) for column, var_type in variable_types.items() if column in df.columns]
+        if len(present) > 1 and len(df) >= self._parallel_stats_min_rows:
+            with ThreadPoolExecutor(max_workers=min(len(present), os.cpu_count() or 1)) as executor:
+                computed = dict(zip([column for column, _ in present], executor.map(column_statistics, present)))
+        else:
+            computed = {column: column_statistics((column, var_type)) for column, var_type in present}
         
         for column, var_type in variable_types.items():
-            try:
-                print(f"Procesando columna: {column}, tipo: {var_type}")
-                
-                # Verificar que la columna existe en el DataFrame
-                if column not in df.columns:
-                    print(f"Advertencia: Columna {column} no existe en el DataFrame")
-                    summary[column] = {
-                        "type": var_type,
-                        "error": f"Columna {column} no encontrada en el dataset",
-                        "missing_values": 0,
-                        "unique_values": 0
-                    }
-                    continue
-                
-                if var_type in ["cuantitativa_continua", "cuantitativa_discreta"]:
-                    # Obtener estadísticas de forma segura
-                    mean_val = self.safe_float(df[column].mean())
-                    median_val = self.safe_float(df[column].median())
-                    std_val = self.safe_float(df[column].std())
-                    min_val = self.safe_float(df[column].min())
-                    max_val = self.safe_float(df[column].max())
-                    
-                    summary[column] = {
-                        "type": var_type,
-                        "mean": mean_val,
-                        "median": median_val,
-                        "std": std_val,
-                        "min": min_val,
-                        "max": max_val,
-                        "missing_values": int(df[column].isna().sum()),
-                        "unique_values": int(df[column].nunique())
-                    }
-                else:
-                    # Para variables cualitativas
-                    mode_result = df[column].mode()
-                    most_common = mode_result.iloc[0] if not mode_result.empty else None
-                    
-                    # Convertir frequency_table a valores serializables
-                    freq_table = df[column].value_counts().head(10)
-                    freq_dict = {}
-                    for key, value in freq_table.items():
-                        # Asegurar que la clave sea string y el valor sea int
-                        freq_dict[str(key)] = int(value)
-                    
-                    summary[column] = {
-                        "type": var_type,
-                        "unique_values": int(df[column].nunique()),
-                        "missing_values": int(df[column].isna().sum()),
-                        "most_common": str(most_common) if most_common is not None else None,
-                        "frequency_table": freq_dict
-                    }
-                
-                print(f"Estadísticas completadas para columna: {column}")
-                
-            except Exception as e:
-                print(f"Error procesando columna {column}: {str(e)}")
-                # Si hay error con una columna, crear estadísticas básicas
+            # Verificar que la columna existe en el DataFrame
+            if column not in df.columns:
+                logger.warning("Columna %s no existe en el DataFrame", column)
                 summary[column] = {
                     "type": var_type,
-                    "error": f"Error procesando columna: {str(e)}",
-                    "missing_values": int(df[column].isna().sum()) if column in df.columns else 0,
-                    "unique_values": int(df[column].nunique()) if column in df.columns else 0
+                    "error": f"Columna {column} no encontrada en el dataset",
+                    "missing_values": 0,
+                    "unique_values": 0
                 }
+            else:
+                summary[column] = computed[column]
         
-        print(f"Estadísticas completadas para {len(summary)} variables")
+        logger.debug("Estadísticas completadas para %d variables", len(summary))
         
         # Guardar en caché si hay filename
-        if filename:
-            self._statistics_cache[filename] = summary.copy()
+        if cache_key is not None:
+            self._statistics_cache[filename] = (cache_key, summary.copy())
         
         return summary
     
+    def _numeric_stats(self, series: pd.Series) -> Dict[str, Any]:
+        """
+        Estadísticas de una columna numérica con una única máscara de NaN.
+        
+        Reproduce exactamente los resultados de mean/median/std/min/max/nunique de pandas
+        (mismo orden de suma con los NaN rellenados con 0 y varianza en dos pasadas),
+        pero sin que cada reducción vuelva a calcular la máscara de faltantes.
+        
+        Args:
+            series: Columna con dtype entero o real (incluidos Int64/Float64).
+        
+        Returns:
+            Diccionario con mean, median, std, min, max, missing_values y unique_values.
+        """
+        raw = series.to_numpy()
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        mask = np.isnan(values)
+        n_missing = int(np.count_nonzero(mask))
+        valid = values[~mask] if n_missing else values
+        n_valid = valid.size
+        
+        if n_valid == 0:
+            return {
+                "mean": None, "median": None, "std": None, "min": None, "max": None,
+                "missing_values": n_missing, "unique_values": 0
+            }
+        
+        # Columna constante: no hace falta suma, varianza, selección ni tabla hash. El límite
+        # 2**53 garantiza que enteros distintos no se hayan confundido al pasar a float64
+        vmin, vmax = valid.min(), valid.max()
+        if vmin == vmax and abs(vmin) < 2 ** 53:
+            constant = self.safe_float(vmin)
+            return {
+                "mean": constant, "median": constant, "std": 0.0 if n_valid > 1 else None,
+                "min": constant, "max": constant,
+                "missing_values": n_missing, "unique_values": 1
+            }
+        
+        filled = np.where(mask, 0.0, values) if n_missing else values
+        mean = filled.sum() / n_valid
+        
+        std = None
+        if n_valid > 1:
+            squared = (mean - filled) ** 2
+            if n_missing:
+                squared[mask] = 0.0
+            std = math.sqrt(squared.sum() / (n_valid - 1))
+        
+        # Mediana con selección parcial (np.partition) en lugar de un ordenamiento completo
+        k = n_valid // 2
+        if n_valid % 2:
+            median = np.partition(valid, k)[k]
+        else:
+            median = np.mean(np.partition(valid, [k - 1, k])[k - 1:k + 1])
+        
+        # Valores únicos sobre los datos originales (enteros grandes no colapsan al pasar a float)
+        unique_source = raw[~mask] if n_missing else raw
+        
+        return {
+            "mean": self.safe_float(mean),
+            "median": self.safe_float(median),
+            "std": self.safe_float(std),
+            "min": self.safe_float(vmin),
+            "max": self.safe_float(vmax),
+            "missing_values": n_missing,
+            "unique_values": int(pd.unique(unique_source).size)
+        }
+    
+    def _compute_column_statistics(self, series: pd.Series, var_type: str) -> Dict[str, Any]:
+        """
+        Calcular las estadísticas de una columna fuera del bloque numérico.
+        
+        Args:
+            series: Columna del DataFrame.
+            var_type: Tipo de variable asignado a la columna.
+        
+        Returns:
+            Diccionario con las estadísticas de la columna (o un error y conteos básicos).
+        """
+        # Máscara de NaN calculada una sola vez por columna y reutilizada en todas las ramas
+        na_mask = series.isna()
+        n_missing = int(na_mask.sum())
+        
+        # Columna vacía o sin ningún valor: nada que resumir
+        if n_missing == len(series):
+            if var_type in ["cuantitativa_continua", "cuantitativa_discreta"]:
+                return {
+                    "type": var_type, "mean": None, "median": None, "std": None, "min": None,
+                    "max": None, "missing_values": n_missing, "unique_values": 0
+                }
+            return {
+                "type": var_type, "unique_values": 0, "missing_values": n_missing,
+                "most_common": None, "frequency_table": {}
+            }
+        
+        try:
+            if var_type in ["cuantitativa_continua", "cuantitativa_discreta"]:
+                # Las reducciones trabajan sobre los valores válidos, sin volver a saltar NaN
+                valid = series[~na_mask] if n_missing else series
+                # Obtener estadísticas de forma segura
+                return {
+                    "type": var_type,
+                    "mean": self.safe_float(valid.mean()),
+                    "median": self.safe_float(valid.median()),
+                    "std": self.safe_float(valid.std()),
+                    "min": self.safe_float(valid.min()),
+                    "max": self.safe_float(valid.max()),
+                    "missing_values": n_missing,
+                    "unique_values": int(valid.nunique())
+                }
+            
+            # Para variables cualitativas: una sola tabla hash (value_counts) sirve para
+            # la moda, el número de valores únicos y la tabla de frecuencias
+            value_counts = series.value_counts()
+            counts = value_counts.to_numpy()
+            
+            # Moda: entre los valores con la frecuencia máxima, el menor (igual que mode())
+            most_common = None
+            if counts.size and counts[0] > 0:
+                top_values = value_counts.index[counts == counts[0]]
+                try:
+                    most_common = top_values.sort_values()[0]
+                except TypeError:
+                    most_common = top_values[0]
+            
+            # Convertir frequency_table a valores serializables
+            freq_table = value_counts.head(10)
+            # Claves a string y conteos a int de una vez (las fechas conservan el formato de str())
+            freq_keys = freq_table.index
+            if freq_keys.dtype.kind in 'mM':
+                freq_keys = [str(key) for key in freq_keys]
+            else:
+                freq_keys = freq_keys.astype(str)
+            freq_dict = dict(zip(freq_keys, freq_table.to_numpy().tolist()))
+            
+            return {
+                "type": var_type,
+                # Las categorías sin observaciones aparecen en value_counts con frecuencia 0
+                "unique_values": int(np.count_nonzero(counts)),
+                "missing_values": n_missing,
+                "most_common": str(most_common) if most_common is not None else None,
+                "frequency_table": freq_dict
+            }
+        except Exception as e:
+            logger.warning("Error procesando columna %s: %s", series.name, e)
+            # Si hay error con una columna, crear estadísticas básicas
+            return {
+                "type": var_type,
+                "error": f"Error procesando columna: {str(e)}",
+                "missing_values": n_missing,
+                "unique_values": int(series[~na_mask].nunique())
+            }
+    
     def update_variable_types(self, filename: str, variable_types: Dict[str, str]) -> Dict[str, Any]:
         """Actualizar tipos de variables de un dataset"""
         if filename not in self.datasets:
@@ -737,6 +1418,10 @@ class DataProcessor:
             # Cargar dataset usando método centralizado
             df = self.get_dataframe(filename)
             
+            # Estado previo (copias: variable_types puede ser el mismo dict guardado)
+            previous_types = dict(self.datasets[filename].get("variable_types") or {})
+            previous_stats = self.datasets[filename].get("summary_stats")
+            
             # Verificar si existe la columna es_outlier en el dataset pero no en variable_types
             if 'es_outlier' in df.columns and 'es_outlier' not in variable_types:
                 variable_types['es_outlier'] = 'cualitativa_nominal_binaria'
@@ -751,26 +1436,32 @@ class DataProcessor:
             # Verificar que todas las columnas del dataset están en variable_types
             missing_types = [col for col in df.columns if col not in variable_types]
             if missing_types:
-                for col in missing_types:
-                    variable_types[col] = self.classify_variable_type(df[col])
+                variable_types.update(self.classify_variable_types(df, missing_types))
             
             # Actualizar tipos de variables
             self.datasets[filename]["variable_types"] = variable_types
+            if variable_types != previous_types:
+                self._mark_dataset_changed(filename)
             
-            # Recalcular estadísticas (forzar recálculo después de cambios)
-            self.datasets[filename]["summary_stats"] = self.get_summary_statistics(df, variable_types, filename=filename, force_recalculate=True)
+            # Recalcular estadísticas: los tipos forman parte de la clave del caché de
+            # estadísticas, así que una actualización sin cambios no recorre columnas
+            summary_stats = self.get_summary_statistics(df, variable_types, filename=filename)
+            self.datasets[filename]["summary_stats"] = summary_stats
             
-            # Guardar cambios
-            self.save_datasets()
+            # Guardar cambios (solo si los hay)
+            if variable_types != previous_types or summary_stats != previous_stats:
+                self.save_datasets()
+            else:
+                logger.debug(f"Tipos de variables sin cambios para '{filename}', no se reescribe el registro")
             
 
             
             result = self.datasets[filename]
-            print(f"Actualización completada exitosamente")
+            logger.debug("Actualización de tipos completada para %s", filename)
             return result
             
         except Exception as e:
-            print(f"Error en update_variable_types: {str(e)}")
+            logger.error("Error en update_variable_types: %s", e)
             import traceback
             traceback.print_exc()
             raise Exception(f"Error actualizando tipos de variables: {str(e)}")
@@ -797,6 +1488,8 @@ class DataProcessor:
             Este método debe ser el único punto de entrada para cargar datasets desde archivos.
             Evita duplicación de código y centraliza el manejo de errores.
             Implementa caché para mejorar rendimiento en accesos repetidos.
+            El DataFrame devuelto es el mismo objeto guardado en caché: no debe modificarse
+            in-place; quien necesite mutarlo debe trabajar sobre ``.copy()``.
         """
         if filename not in self.datasets:
             available = list(self.datasets.keys())
@@ -807,25 +1500,32 @@ class DataProcessor:
         
         # Verificar caché si está habilitado
         if use_cache and self.cache_dataframes and filename in self._dataframe_cache:
-            return self._dataframe_cache[filename].copy()
+            self._dataframe_cache.move_to_end(filename)
+            # Sin copia: los llamadores que modifican el DataFrame deben copiarlo ellos mismos
+            return self._dataframe_cache[filename]
         
         file_path = self.datasets[filename]["file_path"]
         
         try:
-            if file_path.endswith('.csv'):
+            # Reutilizar el DataFrame ya parseado si el archivo no cambió desde la última lectura
+            df = self._load_from_disk_cache(file_path)
+            loaded_from_disk_cache = df is not None
+            if loaded_from_disk_cache:
+                logger.debug(f"Dataset '{filename}' cargado desde caché en disco", extra={'dataset_filename': filename})
+            elif file_path.endswith('.csv'):
                 # Detectar encoding para CSV
                 encoding = self.detect_file_encoding(file_path)
                 try:
-                    df = pd.read_csv(file_path, encoding=encoding, on_bad_lines='skip', engine='python')
+                    df = self._read_csv(file_path, encoding)
                 except UnicodeDecodeError:
                     # Fallback a otros encodings comunes
                     logger.warning(
                         f"Error con encoding '{encoding}' para '{filename}', intentando fallbacks",
-                        extra={'filename': filename, 'encoding': encoding}
+                        extra={'dataset_filename': filename, 'encoding': encoding}
                     )
                     for fallback_encoding in ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']:
                         try:
-                            df = pd.read_csv(file_path, encoding=fallback_encoding, on_bad_lines='skip', engine='python')
+                            df = self._read_csv(file_path, fallback_encoding)
                             break
                         except (UnicodeDecodeError, Exception):
                             continue
@@ -839,19 +1539,24 @@ class DataProcessor:
                     # Intentar con engine alternativo
                     logger.warning(
                         f"Error cargando Excel '{filename}' con engine por defecto: {str(e)}",
-                        extra={'filename': filename, 'error': str(e)}
+                        extra={'dataset_filename': filename, 'error': str(e)}
                     )
                     try:
                         df = pd.read_excel(file_path, engine='xlrd' if file_path.endswith('.xls') else 'openpyxl')
                     except Exception as excel_error:
                         error_msg = f"Error cargando archivo Excel '{filename}': {str(excel_error)}. El archivo puede estar corrupto."
-                        logger.error(error_msg, extra={'filename': filename, 'error': str(excel_error)}, exc_info=True)
+                        logger.error(error_msg, extra={'dataset_filename': filename, 'error': str(excel_error)}, exc_info=True)
                         raise ValueError(error_msg) from excel_error
             
             # Validar que el DataFrame no esté vacío
             if df.empty:
                 raise ValueError(f"El archivo '{filename}' está vacío o no contiene datos válidos")
             
+            if not loaded_from_disk_cache:
+                df = self._normalize_loaded_frame(df)
+                self._save_to_disk_cache(file_path, df)
+            df = self._apply_category_columns(filename, df)
+            
             # Guardar en caché si está habilitado
             if self.cache_dataframes:
                 self._update_cache(filename, df)
@@ -862,7 +1567,7 @@ class DataProcessor:
             raise
         except Exception as e:
             error_msg = f"Error cargando archivo del dataset '{filename}' desde '{file_path}': {str(e)}"
-            logger.error(error_msg, extra={'filename': filename, 'file_path': file_path, 'error': str(e)}, exc_info=True)
+            logger.error(error_msg, extra={'dataset_filename': filename, 'file_path': file_path, 'error': str(e)}, exc_info=True)
             raise Exception(error_msg) from e
     
     def get_dataframe_paginated(self, filename: str, page: int = 1, page_size: int = 1000) -> Dict[str, Any]:
@@ -907,28 +1612,45 @@ class DataProcessor:
             filename: Nombre del archivo.
             df: DataFrame a guardar en caché.
         """
-        # Calcular tamaño aproximado del DataFrame en MB
-        df_size_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
-        
-        # Si el caché es muy grande, limpiar el más antiguo
-        if self._dataframe_cache:
-            total_cache_size = sum(
-                cached_df.memory_usage(deep=True).sum() / (1024 * 1024)
-                for cached_df in self._dataframe_cache.values()
-            )
-            
-            if total_cache_size + df_size_mb > self.max_cache_size_mb:
-                # Eliminar el más antiguo
-                oldest = min(self._cache_timestamps.items(), key=lambda x: x[1])
-                if oldest[0] in self._dataframe_cache:
-                    del self._dataframe_cache[oldest[0]]
-                    del self._cache_timestamps[oldest[0]]
-                    if oldest[0] in self._statistics_cache:
-                        del self._statistics_cache[oldest[0]]
+        # Si ya estaba en caché, descontar la versión anterior (tamaño registrado al insertarla)
+        if self._dataframe_cache.pop(filename, None) is not None:
+            self._cache_bytes -= self._cache_sizes.pop(filename, 0)
+        
+        # Calcular tamaño del DataFrame en bytes una sola vez
+        df_bytes = self._estimate_df_bytes(df)
+        max_bytes = self.max_cache_size_mb * 1024 * 1024
+        
+        # Si el caché es muy grande, expulsar los menos usados recientemente (LRU)
+        while self._dataframe_cache and self._cache_bytes + df_bytes > max_bytes:
+            oldest, _ = self._dataframe_cache.popitem(last=False)
+            self._cache_bytes -= self._cache_sizes.pop(oldest, 0)
+            self._statistics_cache.pop(oldest, None)
+        if not self._dataframe_cache:
+            self._cache_bytes = 0
         
         # Guardar en caché
         self._dataframe_cache[filename] = df
-        self._cache_timestamps[filename] = time.time()
+        self._cache_sizes[filename] = df_bytes
+        self._cache_bytes += df_bytes
+    
+    @staticmethod
+    def _estimate_df_bytes(df: pd.DataFrame) -> int:
+        """
+        Estimar en O(columnas) la memoria de un DataFrame para la contabilidad del caché.
+        
+        ``memory_usage(deep=True)`` mide cada objeto de las columnas object (O(filas)); aquí
+        esas celdas se aproximan con un tamaño fijo, suficiente para decidir expulsiones.
+        
+        Args:
+            df: DataFrame a medir.
+        
+        Returns:
+            Tamaño aproximado en bytes.
+        """
+        shallow_bytes = int(df.memory_usage(index=True, deep=False).sum())
+        object_cols = sum(1 for dtype in df.dtypes if dtype == object)
+        # memory_usage(deep=False) ya cuenta 8 bytes por puntero; se suman ~56 por objeto
+        return shallow_bytes + object_cols * len(df) * 56
     
     def clear_cache(self, filename: str = None):
         """
@@ -938,19 +1660,25 @@ class DataProcessor:
             filename: Si se especifica, solo limpia ese dataset. Si es None, limpia todo.
         """
         if filename:
-            self._dataframe_cache.pop(filename, None)
-            self._cache_timestamps.pop(filename, None)
+            if self._dataframe_cache.pop(filename, None) is not None:
+                self._cache_bytes = max(0, self._cache_bytes - self._cache_sizes.pop(filename, 0))
             self._statistics_cache.pop(filename, None)
+            for key in [key for key in self._processed_frames if key[0] == filename]:
+                del self._processed_frames[key]
         else:
             self._dataframe_cache.clear()
-            self._cache_timestamps.clear()
+            self._cache_sizes.clear()
+            self._cache_bytes = 0
             self._statistics_cache.clear()
+            self._processed_frames.clear()
     
     def get_dataset_preview(self, filename: str, rows: int = 10) -> List[Dict[str, Any]]:
         """
         Obtener vista previa de un dataset.
         
-        Optimizado para usar caché y solo cargar las filas necesarias.
+        Optimizado para usar caché y solo cargar las filas necesarias: si el dataset no
+        está en memoria se leen únicamente las primeras filas del archivo, sin cargarlo
+        entero ni poblar el caché.
         
         Args:
             filename: Nombre del archivo del dataset.
@@ -959,8 +1687,38 @@ class DataProcessor:
         Returns:
             Lista de diccionarios con los datos de la vista previa.
         """
+        if filename in self.datasets and filename not in self._dataframe_cache:
+            head_df = self._read_head(self.datasets[filename]["file_path"], rows)
+            if head_df is not None and not head_df.empty:
+                return self.safe_preview_data(self._apply_category_columns(filename, head_df))
+        
         df = self.get_dataframe(filename, use_cache=True)
         return self.safe_preview_data(df.head(rows))
+    
+    def _read_head(self, file_path: str, rows: int) -> Optional[pd.DataFrame]:
+        """
+        Leer solo las primeras filas de un archivo de datos.
+        
+        Args:
+            file_path: Ruta al archivo CSV o Excel.
+            rows: Número de filas a leer.
+        
+        Returns:
+            DataFrame con las primeras filas (con el mismo tratamiento posterior que una
+            carga completa), o None si no se pudo leer (el llamador recurre entonces a la
+            carga completa).
+        """
+        try:
+            if file_path.endswith('.csv'):
+                # El motor C admite nrows y se detiene tras las filas pedidas
+                head_df = pd.read_csv(file_path, encoding=self.detect_file_encoding(file_path),
+                                      nrows=rows, on_bad_lines='skip', float_precision='round_trip')
+            else:
+                head_df = pd.read_excel(file_path, nrows=rows)
+            return self._normalize_loaded_frame(head_df)
+        except Exception as e:
+            logger.debug(f"Lectura parcial de '{file_path}' falló, cargando completo: {e}")
+            return None
 
     # Preprocessing methods
     def preprocess_missing_values(self, filename: str, strategy: str, constant_value: str = None) -> Dict[str, Any]:
@@ -1018,19 +1776,21 @@ class DataProcessor:
         
         try:
             # Cargar dataset usando método centralizado
-            df = self.get_dataframe(filename)
+            # Copia propia: el DataFrame en caché se comparte y este método lo modifica
+            df = self.get_dataframe(filename).copy()
             
             original_rows = len(df)
-            original_missing = df.isnull().sum().sum()
             
-            # Contar valores faltantes por columna antes del procesamiento
-            missing_by_column = df.isnull().sum().to_dict()
-            missing_by_column = {k: int(v) for k, v in missing_by_column.items() if v > 0}
+            # Contar valores faltantes por columna antes del procesamiento (una sola pasada)
+            missing_counts = df.isnull().sum()
+            original_missing = missing_counts.sum()
+            columns_with_missing = missing_counts[missing_counts.to_numpy() > 0]
+            missing_by_column = dict(zip(columns_with_missing.index, columns_with_missing.to_numpy().tolist()))
             
             logger.info(
                 f"Procesando valores faltantes para '{filename}' con estrategia '{strategy}'",
                 extra={
-                    'filename': filename,
+                    'dataset_filename': filename,
                     'strategy': strategy,
                     'original_rows': original_rows,
                     'original_missing': int(original_missing),
@@ -1046,61 +1806,30 @@ class DataProcessor:
                     f"Eliminadas {rows_removed} filas con valores faltantes",
                     extra={'rows_removed': rows_removed}
                 )
-            elif strategy == "fill_mean":
-                numeric_columns = df.select_dtypes(include=[np.number]).columns
-                imputed_counts = {}
-                for col in numeric_columns:
-                    missing_count = df[col].isnull().sum()
-                    if missing_count > 0:
-                        mean_value = df[col].mean()
-                        df[col] = df[col].fillna(mean_value)
-                        imputed_counts[col] = {
-                            'count': int(missing_count),
-                            'imputed_value': float(mean_value),
-                            'method': 'mean'
-                        }
-                logger.info(
-                    f"Imputados valores faltantes con media en {len(imputed_counts)} columnas",
-                    extra={'imputed_counts': imputed_counts}
-                )
-            elif strategy == "fill_median":
-                numeric_columns = df.select_dtypes(include=[np.number]).columns
-                imputed_counts = {}
-                for col in numeric_columns:
-                    missing_count = df[col].isnull().sum()
-                    if missing_count > 0:
-                        median_value = df[col].median()
-                        df[col] = df[col].fillna(median_value)
-                        imputed_counts[col] = {
-                            'count': int(missing_count),
-                            'imputed_value': float(median_value),
-                            'method': 'median'
-                        }
-                logger.info(
-                    f"Imputados valores faltantes con mediana en {len(imputed_counts)} columnas",
-                    extra={'imputed_counts': imputed_counts}
-                )
-            elif strategy == "fill_mode":
-                imputed_counts = {}
-                for col in df.columns:
-                    if df[col].dtype == 'object':
-                        missing_count = df[col].isnull().sum()
-                        if missing_count > 0:
-                            mode_value = df[col].mode()
-                            if not mode_value.empty:
-                                mode_val = mode_value.iloc[0]
-                                df[col] = df[col].fillna(mode_val)
-                                imputed_counts[col] = {
-                                    'count': int(missing_count),
-                                    'imputed_value': str(mode_val),
-                                    'method': 'mode'
-                                }
+            elif strategy in ("fill_mean", "fill_median", "fill_mode"):
+                # Valores de imputación de todas las columnas con faltantes en una sola llamada
+                # y un único fillna in-place sobre la copia propia
+                fill_values = self._missing_fill_values(df, strategy, missing_counts)
+                valid_fill = fill_values[fill_values.notna()]
+                if len(valid_fill):
+                    df.fillna(valid_fill.to_dict(), inplace=True)
+                
+                method = strategy[len("fill_"):]
+                imputed_counts = {
+                    col: {
+                        'count': int(missing_counts[col]),
+                        'imputed_value': str(value) if method == 'mode' else float(value),
+                        'method': method
+                    }
+                    for col, value in fill_values.items()
+                }
+                method_label = {'mean': 'media', 'median': 'mediana', 'mode': 'moda'}[method]
                 logger.info(
-                    f"Imputados valores faltantes con moda en {len(imputed_counts)} columnas",
+                    f"Imputados valores faltantes con {method_label} en {len(imputed_counts)} columnas",
                     extra={'imputed_counts': imputed_counts}
                 )
             elif strategy == "fill_constant" and constant_value is not None:
-                df = df.fillna(constant_value)
+                df = self._fillna_constant(df, constant_value)
                 logger.info(
                     f"Imputados todos los valores faltantes con constante '{constant_value}'",
                     extra={'constant_value': str(constant_value)}
@@ -1123,6 +1852,7 @@ class DataProcessor:
             
             # Actualizar dataset
             self.datasets[filename]["rows"] = processed_rows
+            self._mark_dataset_changed(filename)
             self.datasets[filename]["preview"] = self.safe_preview_data(df.head(10))
             self.datasets[filename]["missing_values_info"] = missing_info
             
@@ -1140,7 +1870,7 @@ class DataProcessor:
             
             logger.info(
                 f"Procesamiento de valores faltantes completado para '{filename}'",
-                extra={'filename': filename, 'missing_info': missing_info}
+                extra={'dataset_filename': filename, 'missing_info': missing_info}
             )
             
             return result
@@ -1152,14 +1882,14 @@ class DataProcessor:
             error_msg = f"Error procesando valores faltantes para dataset '{filename}': {str(e)}"
             logger.error(
                 error_msg,
-                extra={'filename': filename, 'strategy': strategy, 'error': str(e)},
+                extra={'dataset_filename': filename, 'strategy': strategy, 'error': str(e)},
                 exc_info=True
             )
             raise Exception(error_msg) from e
 
     def preprocess_duplicates(self, filename: str, strategy: str) -> Dict[str, Any]:
         """Procesar duplicados en un dataset"""
-        print(f"Procesando duplicados para {filename} con estrategia: {strategy}")
+        logger.debug("Procesando duplicados para %s con estrategia: %s", filename, strategy)
         
         if filename not in self.datasets:
             raise Exception("Dataset no encontrado")
@@ -1169,21 +1899,17 @@ class DataProcessor:
             df = self.get_dataframe(filename)
             
             original_rows = len(df)
-            print(f"Dataset original: {original_rows} filas")
+            logger.debug("Dataset original: %d filas", original_rows)
             
             # Aplicar estrategia de duplicados
-            if strategy == "drop":
-                df = df.drop_duplicates()
-            elif strategy == "keep_first":
-                df = df.drop_duplicates(keep='first')
-            elif strategy == "keep_last":
-                df = df.drop_duplicates(keep='last')
+            df = self._apply_duplicates_strategy(df, strategy)
             
             processed_rows = len(df)
-            print(f"Dataset procesado: {processed_rows} filas")
+            logger.debug("Dataset procesado: %d filas", processed_rows)
             
             # Actualizar dataset
             self.datasets[filename]["rows"] = processed_rows
+            self._mark_dataset_changed(filename)
             self.datasets[filename]["preview"] = self.safe_preview_data(df.head(10))
             
             # Recalcular estadísticas
@@ -1194,69 +1920,63 @@ class DataProcessor:
             self.save_datasets()
             
             result = self.datasets[filename]
-            print(f"Procesamiento de duplicados completado")
+            logger.debug("Procesamiento de duplicados completado")
             return result
             
         except Exception as e:
-            print(f"Error en preprocess_duplicates: {str(e)}")
+            logger.error("Error en preprocess_duplicates: %s", e)
             raise Exception(f"Error procesando duplicados: {str(e)}")
 
+    @staticmethod
+    def _cap_numeric_block(df: pd.DataFrame, columns: List[str], values: np.ndarray,
+                           lower: np.ndarray, upper: np.ndarray) -> pd.DataFrame:
+        """Recorta el bloque numérico (in-place sobre ``values``) y devuelve un DataFrame nuevo.
+        
+        El resultado es una copia superficial de ``df`` en la que solo se reemplazan las
+        columnas modificadas; el resto comparte memoria con ``df``, que no se modifica.
+        Las columnas sin valores fuera de límites conservan su dtype original (igual que
+        ``DataFrame.clip``), de modo que las enteras no se convierten a float sin necesidad.
+        """
+        changed = ((values < lower) | (values > upper)).any(axis=0)
+        if not changed.any():
+            return df
+        np.clip(values, lower, upper, out=values)
+        changed_idx = np.flatnonzero(changed)
+        df = df.copy(deep=False)
+        df[[columns[i] for i in changed_idx]] = values[:, changed_idx]
+        return df
+    
     def preprocess_outliers(self, filename: str, method: str, strategy: str) -> Dict[str, Any]:
         """Procesar outliers en un dataset"""
-        print(f"Procesando outliers para {filename} con método: {method}, estrategia: {strategy}")
+        logger.debug("Procesando outliers para %s con método: %s, estrategia: %s", filename, method, strategy)
         
         if filename not in self.datasets:
             raise Exception("Dataset no encontrado")
         
         try:
-            # Cargar dataset usando método centralizado
+            # Cargar dataset usando método centralizado (_apply_outliers_strategy no lo modifica)
             df = self.get_dataframe(filename)
             
             original_rows = len(df)
-            print(f"Dataset original: {original_rows} filas")
+            logger.debug("Dataset original: %d filas", original_rows)
             
             # Obtener columnas numéricas
             numeric_columns = df.select_dtypes(include=[np.number]).columns
             
             if len(numeric_columns) == 0:
-                print("No hay columnas numéricas para procesar outliers")
+                logger.debug("No hay columnas numéricas para procesar outliers")
                 return self.datasets[filename]
             
-            # Aplicar detección y tratamiento de outliers
-            for col in numeric_columns:
-                if method == "iqr":
-                    Q1 = df[col].quantile(0.25)
-                    Q3 = df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower_bound = Q1 - 1.5 * IQR
-                    upper_bound = Q3 + 1.5 * IQR
-                    
-                    if strategy == "remove":
-                        df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-                    elif strategy == "cap":
-                        df[col] = df[col].clip(lower=lower_bound, upper=upper_bound)
-                    elif strategy == "transform":
-                        df[col] = np.log1p(df[col] - df[col].min() + 1)
-                
-                elif method == "zscore":
-                    z_scores = np.abs((df[col] - df[col].mean()) / df[col].std())
-                    
-                    if strategy == "remove":
-                        df = df[z_scores < 3]
-                    elif strategy == "cap":
-                        threshold = 3
-                        df[col] = df[col].clip(
-                            lower=df[col].mean() - threshold * df[col].std(),
-                            upper=df[col].mean() + threshold * df[col].std()
-                        )
-                    elif strategy == "transform":
-                        df[col] = np.log1p(df[col] - df[col].min() + 1)
+            # Detección y tratamiento sobre el bloque numérico completo (kernel compartido
+            # con apply_all_preprocessing)
+            df = self._apply_outliers_strategy(df, method, strategy)
             
             processed_rows = len(df)
-            print(f"Dataset procesado: {processed_rows} filas")
+            logger.debug("Dataset procesado: %d filas", processed_rows)
             
             # Actualizar dataset
             self.datasets[filename]["rows"] = processed_rows
+            self._mark_dataset_changed(filename)
             self.datasets[filename]["preview"] = self.safe_preview_data(df.head(10))
             
             # Recalcular estadísticas
@@ -1267,40 +1987,106 @@ class DataProcessor:
             self.save_datasets()
             
             result = self.datasets[filename]
-            print(f"Procesamiento de outliers completado")
+            logger.debug("Procesamiento de outliers completado")
             return result
             
         except Exception as e:
-            print(f"Error en preprocess_outliers: {str(e)}")
+            logger.error("Error en preprocess_outliers: %s", e)
             raise Exception(f"Error procesando outliers: {str(e)}")
 
+    @staticmethod
+    def _convert_low_cardinality_to_category(df: pd.DataFrame, max_unique_ratio: float = 0.5) -> List[str]:
+        """
+        Convertir in-place a ``category`` las columnas de texto con baja cardinalidad.
+        
+        Solo se convierten columnas de texto (object con todos sus valores cadenas, o ya con
+        dtype string; las mixtas se dejan igual) y cuya proporción de valores distintos es menor que ``max_unique_ratio``.
+        
+        Args:
+            df: DataFrame a modificar.
+            max_unique_ratio: Proporción máxima de valores únicos respecto al número de filas.
+        
+        Returns:
+            Lista de columnas convertidas.
+        """
+        n_rows = len(df)
+        if n_rows == 0:
+            return []
+        
+        converted = []
+        for column, dtype in df.dtypes.items():
+            if dtype != object and not isinstance(dtype, pd.StringDtype):
+                continue
+            series = df[column]
+            if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+                continue
+            if series.nunique() / n_rows < max_unique_ratio:
+                df[column] = series.astype('category')
+                converted.append(column)
+        return converted
+    
+    @staticmethod
+    def _fillna_constant(df: pd.DataFrame, constant_value: Any) -> pd.DataFrame:
+        """
+        Imputar todos los faltantes con una constante, admitiendo columnas ``category``.
+        
+        En las columnas categóricas la constante se añade antes como categoría, ya que
+        ``fillna`` no acepta valores fuera de las categorías existentes. ``df`` no se modifica.
+        """
+        df = df.copy(deep=False)
+        for column, dtype in df.dtypes.items():
+            if (isinstance(dtype, pd.CategoricalDtype) and constant_value not in dtype.categories
+                    and df[column].hasnans):
+                df[column] = df[column].cat.add_categories([constant_value])
+        return df.fillna(constant_value)
+    
     def preprocess_data_types(self, filename: str, action: str, conversion_params: Dict = None) -> Dict[str, Any]:
         """Procesar tipos de datos en un dataset"""
-        print(f"Procesando tipos de datos para {filename} con acción: {action}")
+        logger.debug("Procesando tipos de datos para %s con acción: %s", filename, action)
         
         if filename not in self.datasets:
             raise Exception("Dataset no encontrado")
         
         try:
             # Cargar dataset usando método centralizado
-            df = self.get_dataframe(filename)
+            # Copia propia: el DataFrame en caché se comparte y este método lo modifica
+            df = self.get_dataframe(filename).copy()
             
             if action == "auto":
                 # Detectar automáticamente tipos de variables solo para columnas que no tienen tipo asignado
                 existing_variable_types = self.datasets[filename].get("variable_types", {})
                 variable_types = existing_variable_types.copy()  # Preservar tipos existentes
                 
-                for column in df.columns:
-                    # Solo clasificar automáticamente si no existe un tipo guardado
-                    if column not in existing_variable_types:
-                        variable_types[column] = self.classify_variable_type(df[column])
+                # Solo clasificar automáticamente (en bloque) las columnas sin tipo guardado
+                variable_types.update(self.classify_variable_types(
+                    df, [column for column in df.columns if column not in existing_variable_types]
+                ))
                 
                 # Verificar si existe la columna es_outlier en el dataset pero no en variable_types
                 if 'es_outlier' in df.columns and 'es_outlier' not in variable_types:
                     variable_types['es_outlier'] = 'cualitativa_nominal_binaria'
                 
+                # Columnas de texto con pocos valores distintos → dtype category (códigos enteros).
+                # La conversión se registra en los metadatos del dataset y get_dataframe la
+                # reaplica en cada carga; el caché en disco conserva los dtypes del archivo
+                converted = self._convert_low_cardinality_to_category(df)
+                if converted or variable_types != existing_variable_types:
+                    self._mark_dataset_changed(filename)
+                if converted:
+                    logger.info(f"Columnas convertidas a category en '{filename}': {converted}")
+                    category_columns = self.datasets[filename].get("category_columns", [])
+                    self.datasets[filename]["category_columns"] = category_columns + [
+                        column for column in converted if column not in category_columns
+                    ]
+                    if self.cache_dataframes:
+                        self._update_cache(filename, df)
+                
                 self.datasets[filename]["variable_types"] = variable_types
-                self.datasets[filename]["summary_stats"] = self.get_summary_statistics(df, variable_types)
+                # Con filename se reutilizan las estadísticas ya calculadas para este dataset si
+                # la clasificación no cambió nada
+                self.datasets[filename]["summary_stats"] = self.get_summary_statistics(
+                    df, variable_types, filename=filename
+                )
             
             elif action == "convert" and conversion_params:
                 # Convertir tipo de datos de una variable específica
@@ -1310,7 +2096,7 @@ class DataProcessor:
                 if variable not in df.columns:
                     raise Exception(f"Variable '{variable}' no encontrada en el dataset")
                 
-                print(f"Convirtiendo variable '{variable}' a tipo '{target_type}'")
+                logger.debug("Convirtiendo variable '%s' a tipo '%s'", variable, target_type)
                 
                 if target_type == "numeric":
                     # Convertir a numérico
@@ -1325,32 +2111,45 @@ class DataProcessor:
                     # Convertir a booleano
                     df[variable] = df[variable].astype(bool)
                 
+                # La conversión manual reemplaza a la conversión a category registrada por "auto"
+                category_columns = [column for column in self.datasets[filename].get("category_columns", [])
+                                    if column != variable]
+                if target_type == "categorical":
+                    category_columns.append(variable)
+                self.datasets[filename]["category_columns"] = category_columns
+                
                 # Reclasificar el tipo de variable después de la conversión
                 variable_types = self.datasets[filename].get("variable_types", {})
                 variable_types[variable] = self.classify_variable_type(df[variable])
                 self.datasets[filename]["variable_types"] = variable_types
+                self._mark_dataset_changed(filename)
                 
-                # Recalcular estadísticas
-                self.datasets[filename]["summary_stats"] = self.get_summary_statistics(df, variable_types)
+                # Recalcular estadísticas (el DataFrame convertido pasa a ser el contenido del dataset)
+                self.datasets[filename]["summary_stats"] = self.get_summary_statistics(
+                    df, variable_types, filename=filename
+                )
                 
-                # Guardar el dataset modificado
-                df.to_csv(file_path, index=False)
-                print(f"Dataset guardado con conversión de tipo")
+                # Guardar el dataset modificado y mantener el caché en memoria al día
+                file_path = self.datasets[filename]["file_path"]
+                self._write_dataframe(df, file_path)
+                if self.cache_dataframes:
+                    self._update_cache(filename, df)
+                logger.debug("Dataset guardado con conversión de tipo")
             
             # Guardar cambios
             self.save_datasets()
             
             result = self.datasets[filename]
-            print(f"Procesamiento de tipos de datos completado")
+            logger.debug("Procesamiento de tipos de datos completado")
             return result
             
         except Exception as e:
-            print(f"Error en preprocess_data_types: {str(e)}")
+            logger.error("Error en preprocess_data_types: %s", e)
             raise Exception(f"Error procesando tipos de datos: {str(e)}")
 
     def apply_all_preprocessing(self, filename: str, steps: List[Dict]) -> Dict[str, Any]:
         """Aplicar todos los cambios de preprocesamiento a una copia del dataset"""
-        print(f"Aplicando todos los cambios de preprocesamiento para {filename}")
+        logger.debug("Aplicando todos los cambios de preprocesamiento para %s", filename)
         
         if filename not in self.datasets:
             raise Exception("Dataset no encontrado")
@@ -1359,16 +2158,28 @@ class DataProcessor:
             # Cargar dataset original usando método centralizado (sin modificar)
             df_original = self.get_dataframe(filename)
             
-            # Crear una copia para procesar (el original permanece intacto)
-            df_processed = df_original.copy()
-            
             original_rows = len(df_original)
-            print(f"Dataset original: {original_rows} filas")
-            
-            # Aplicar cada paso de preprocesamiento a la copia
-            for step in steps:
+            logger.debug("Dataset original: %d filas", original_rows)
+            
+            existing_variable_types = self.datasets[filename].get("variable_types", {})
+            
+            # Reanudar desde el prefijo de pasos más largo ya calculado (en la UI lo habitual
+            # es añadir un paso a una secuencia ya aplicada)
+            start = 0
+            df_processed = df_original
+            for prefix_length in range(len(steps), 0, -1):
+                cached = self._recall_processed_frame(filename, steps[:prefix_length], None)
+                if cached is not None:
+                    start, df_processed = prefix_length, cached
+                    logger.debug("Reutilizando resultado de los primeros %d pasos", prefix_length)
+                    break
+            
+            # Aplicar cada paso restante. Los helpers _apply_* nunca modifican su entrada y devuelven
+            # DataFrames que comparten las columnas no tratadas, así que el original y los prefijos en
+            # caché se usan sin copiarlos
+            for step_number, step in enumerate(steps[start:], start + 1):
                 step_type = step.get("type")
-                print(f"Aplicando paso: {step_type}")
+                logger.debug("Aplicando paso: %s", step_type)
                 
                 if step_type == "missing_values":
                     strategy = step.get("strategy", "drop")
@@ -1384,23 +2195,15 @@ class DataProcessor:
                     strategy = step.get("strategy", "remove")
                     df_processed = self._apply_outliers_strategy(df_processed, method, strategy)
                 
-                elif step_type == "data_types":
-                    action = step.get("action", "auto")
-                    if action == "auto":
-                        # Preservar tipos existentes y solo clasificar automáticamente los que no tienen tipo
-                        existing_variable_types = self.datasets[filename].get("variable_types", {})
-                        variable_types = existing_variable_types.copy()
-                        
-                        for column in df_processed.columns:
-                            if column not in existing_variable_types:
-                                variable_types[column] = self.classify_variable_type(df_processed[column])
-                        
-                        # Verificar si existe la columna es_outlier en el dataset pero no en variable_types
-                        if 'es_outlier' in df_processed.columns and 'es_outlier' not in variable_types:
-                            variable_types['es_outlier'] = 'cualitativa_nominal_binaria'
+                # "data_types" no modifica el DataFrame: la clasificación se hace tras el bucle
+                
+                self._remember_processed_frame(filename, steps[:step_number], df_processed)
+            
+            if not steps:
+                self._remember_processed_frame(filename, steps, df_processed)
             
             processed_rows = len(df_processed)
-            print(f"Dataset procesado: {processed_rows} filas")
+            logger.debug("Dataset procesado: %d filas", processed_rows)
             
             # Crear resultado con datos procesados (sin modificar el original)
             result = {
@@ -1414,135 +2217,476 @@ class DataProcessor:
                 "rows_removed": original_rows - processed_rows  # Filas eliminadas
             }
             
+            # Tipos de variables: con un paso "data_types" automático se preservan los existentes y
+            # se clasifican una sola vez, sobre las columnas finales, las que no tienen tipo
+            variable_types = existing_variable_types
+            if any(step.get("type") == "data_types" and step.get("action", "auto") == "auto" for step in steps):
+                variable_types = existing_variable_types.copy()
+                variable_types.update(self.classify_variable_types(
+                    df_processed,
+                    [column for column in df_processed.columns if column not in existing_variable_types]
+                ))
+                # Verificar si existe la columna es_outlier en el dataset pero no en variable_types
+                if 'es_outlier' in df_processed.columns and 'es_outlier' not in variable_types:
+                    variable_types['es_outlier'] = 'cualitativa_nominal_binaria'
+            result["variable_types"] = variable_types
+            
             # Recalcular estadísticas para los datos procesados
-            variable_types = self.datasets[filename].get("variable_types", {})
-            result["summary_stats"] = self.get_summary_statistics(df_processed, variable_types)
+            result["summary_stats"] = self._processed_summary_statistics(filename, steps, df_processed, variable_types)
+            
+            # El DataFrame final queda en memoria (último prefijo guardado en el bucle) para que
+            # save_processed_dataset no tenga que reconstruirlo desde la lista que viaja al cliente
             
-            print(f"Aplicación de todos los cambios completada")
+            logger.debug("Aplicación de todos los cambios completada")
             return result
             
         except Exception as e:
-            print(f"Error en apply_all_preprocessing: {str(e)}")
+            logger.error("Error en apply_all_preprocessing: %s", e)
             raise Exception(f"Error aplicando todos los cambios: {str(e)}")
 
+    def _write_dataframe(self, df: pd.DataFrame, file_path: str):
+        """
+        Escribir un DataFrame a CSV o Excel según la extensión del archivo.
+        
+        Los CSV se escriben con el escritor paralelo de polars si está instalado (junto con
+        pyarrow, necesario para convertir desde pandas) y todas las columnas son numéricas,
+        booleanas, de texto o category: polars escribe fechas y duraciones con otro formato,
+        así que esos DataFrames van siempre por pandas para que el archivo no dependa de las
+        librerías instaladas. Si polars falla o no está disponible se usa ``DataFrame.to_csv``
+        sobre un archivo con búfer de 1 MB (menos llamadas de escritura que el búfer por
+        defecto). Excel se escribe con pandas, usando xlsxwriter si está instalado.
+        """
+        if not file_path.endswith('.csv'):
+            df.to_excel(file_path, index=False, engine='xlsxwriter' if XLSXWRITER_AVAILABLE else None)
+            return
+        
+        if POLARS_AVAILABLE and PYARROW_AVAILABLE and self._polars_csv_compatible(df):
+            try:
+                # Booleanos como True/False, igual que to_csv (polars escribe true/false)
+                pl.from_pandas(df, include_index=False).with_columns(
+                    pl.col(pl.Boolean).cast(pl.Utf8).replace({"true": "True", "false": "False"})
+                ).write_csv(file_path)
+                return
+            except Exception as e:
+                logger.debug(f"Escritura con polars falló para '{file_path}', usando pandas: {e}")
+        with open(file_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            df.to_csv(f, index=False)
+    
+    @staticmethod
+    def _polars_csv_compatible(df: pd.DataFrame) -> bool:
+        """
+        Indicar si polars escribe el DataFrame con el mismo texto que ``DataFrame.to_csv``.
+        
+        Solo columnas numéricas, booleanas, de texto (object con todos sus valores cadenas)
+        o category de texto/números. Los flotantes pueden diferir en la notación (``1e-05``
+        frente a ``0.00001``) pero se leen como el mismo valor.
+        """
+        for column, dtype in df.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                if dtype.categories.inferred_type not in ('string', 'integer', 'floating'):
+                    return False
+            elif isinstance(dtype, pd.StringDtype):
+                continue
+            elif dtype == object:
+                if pd.api.types.infer_dtype(df[column], skipna=True) not in ('string', 'empty'):
+                    return False
+            elif dtype.kind not in 'iufb':
+                return False
+        return True
+    
+    def _processed_frame_key(self, filename: str, steps: List[Dict]) -> Optional[Tuple[str, str, int, int, int]]:
+        """
+        Clave de un resultado de apply_all_preprocessing: dataset, pasos, versión del archivo
+        fuente y versión en memoria del dataset (ver _mark_dataset_changed).
+        """
+        try:
+            stat = os.stat(self.datasets[filename]["file_path"])
+            steps_key = json.dumps(steps, sort_keys=True, default=str)
+        except (KeyError, OSError, TypeError, ValueError):
+            return None
+        return (filename, steps_key, stat.st_mtime_ns, stat.st_size, self._dataset_versions.get(filename, 0))
+    
+    def _mark_dataset_changed(self, filename: str):
+        """
+        Registrar un cambio en memoria del dataset o de sus metadatos.
+        
+        Los cambios que no tocan el archivo fuente (conversión a category, tipos de
+        variables, ...) no alteran su stat; la versión forma parte de la clave de los
+        prefijos de apply_all_preprocessing para que nunca se reanude uno obsoleto.
+        """
+        self._dataset_versions[filename] = self._dataset_versions.get(filename, 0) + 1
+        for key in [key for key in self._processed_frames if key[0] == filename]:
+            del self._processed_frames[key]
+    
+    def _remember_processed_frame(self, filename: str, steps: List[Dict], df: pd.DataFrame):
+        """Guardar (LRU) el DataFrame resultante de aplicar ``steps`` a ``filename``."""
+        key = self._processed_frame_key(filename, steps)
+        if key is None:
+            return
+        # El tercer elemento guarda (tipos de variables, estadísticas) una vez calculadas
+        self._processed_frames[key] = [df, self._estimate_df_bytes(df), None]
+        self._processed_frames.move_to_end(key)
+        max_bytes = self._processed_frames_max_mb * 1024 * 1024
+        while len(self._processed_frames) > 1 and (
+            len(self._processed_frames) > self._processed_frames_max_size
+            or sum(entry[1] for entry in self._processed_frames.values()) > max_bytes
+        ):
+            self._processed_frames.popitem(last=False)
+    
+    def _recall_processed_frame(self, filename: str, steps: List[Dict], rows: Optional[int]) -> Optional[pd.DataFrame]:
+        """Recuperar el DataFrame procesado en memoria, o None si no existe o no coincide."""
+        key = self._processed_frame_key(filename, steps) if filename in self.datasets else None
+        entry = self._processed_frames.get(key) if key is not None else None
+        if entry is None or (rows is not None and rows != len(entry[0])):
+            return None
+        self._processed_frames.move_to_end(key)
+        return entry[0]
+    
+    @staticmethod
+    def _same_column_data(a: pd.Series, b: pd.Series) -> bool:
+        """True si ambas columnas son el mismo array en memoria (columna no tocada por un paso)."""
+        if len(a) != len(b) or a.dtype != b.dtype:
+            return False
+        if a.array is b.array:
+            return True
+        if not isinstance(a.dtype, np.dtype):
+            return False
+        # Vistas sin copia de columnas NumPy: mismo buffer, mismo desplazamiento y mismos strides
+        x, y = a.to_numpy(), b.to_numpy()
+        return (x.__array_interface__['data'][0] == y.__array_interface__['data'][0]
+                and x.strides == y.strides)
+    
+    def _processed_summary_statistics(self, filename: str, steps: List[Dict], df: pd.DataFrame,
+                                      variable_types: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Estadísticas del resultado de apply_all_preprocessing reutilizando las de los prefijos en caché.
+        
+        Si el resultado de ``steps`` ya tiene estadísticas para los mismos tipos se devuelven
+        directamente. Si no, las columnas que comparten memoria con el resultado del prefijo
+        anterior (los pasos que solo reemplazan algunas columnas, como "cap" o las imputaciones,
+        no tocan el resto) reutilizan sus estadísticas y solo se recalculan las demás.
+        """
+        # Sin pasos (o solo pasos sin efecto) el resultado es el DataFrame original: sus
+        # estadísticas salen del caché por huella del dataset
+        if df is self._dataframe_cache.get(filename):
+            return self.get_summary_statistics(df, variable_types, filename=filename)
+        
+        key = self._processed_frame_key(filename, steps)
+        entry = self._processed_frames.get(key) if key is not None else None
+        if entry is None or entry[0] is not df:
+            return self.get_summary_statistics(df, variable_types)
+        
+        types_key = tuple(variable_types.items())
+        if entry[2] is not None and entry[2][0] == types_key:
+            return entry[2][1].copy()
+        
+        previous_key = self._processed_frame_key(filename, steps[:-1]) if steps else None
+        previous = self._processed_frames.get(previous_key) if previous_key is not None else None
+        reusable = {}
+        if previous is not None and previous[2] is not None:
+            previous_df, previous_stats = previous[0], previous[2][1]
+            previous_types = dict(previous[2][0])
+            reusable = {
+                column: previous_stats[column]
+                for column, var_type in variable_types.items()
+                if column in df.columns and column in previous_df.columns and column in previous_stats
+                and previous_types.get(column) == var_type
+                and self._same_column_data(df[column], previous_df[column])
+            }
+        
+        pending = {column: var_type for column, var_type in variable_types.items() if column not in reusable}
+        computed = self.get_summary_statistics(df, pending) if pending else {}
+        if reusable:
+            logger.debug("Estadísticas reutilizadas del paso anterior para %d columnas", len(reusable))
+        
+        summary = {column: reusable[column] if column in reusable else computed[column]
+                   for column in variable_types}
+        entry[2] = (types_key, summary.copy())
+        return summary
+    
     def save_processed_dataset(self, original_filename: str, new_name: str, processed_data: Dict) -> Dict[str, Any]:
         """Guardar dataset procesado como archivo físico y en la base de datos"""
-        print(f"Guardando dataset procesado: {new_name}")
+        logger.debug("Guardando dataset procesado: %s", new_name)
         
         try:
-            # Convertir los datos procesados de vuelta a DataFrame
-            df_processed = pd.DataFrame(processed_data.get("processed_data", []))
-            
-            # Determinar la extensión del archivo original
-            original_file_path = self.datasets[original_filename]["file_path"]
-            file_extension = original_file_path.split('.')[-1].lower()
-            
-            # Crear nombre del archivo procesado
-            if file_extension in ['csv', 'xlsx', 'xls']:
-                new_file_path = f"uploads/{new_name}.{file_extension}"
-            else:
-                new_file_path = f"uploads/{new_name}.csv"
+            df_processed, new_filename, new_file_path = self.prepare_processed_dataset(
+                original_filename, new_name, processed_data
+            )
             
             # Guardar como archivo físico
-            if new_file_path.endswith('.csv'):
-                df_processed.to_csv(new_file_path, index=False)
-            else:
-                df_processed.to_excel(new_file_path, index=False)
-            
-            # Crear nuevo dataset con los datos procesados
-            new_dataset = {
-                "filename": f"{new_name}.{file_extension}" if file_extension in ['csv', 'xlsx', 'xls'] else f"{new_name}.csv",
-                "file_path": new_file_path,
-                "rows": processed_data.get("rows", len(df_processed)),
-                "columns": processed_data.get("columns", len(df_processed.columns)),
-                "uploaded_at": pd.Timestamp.now().isoformat(),
-                "preview": self.safe_preview_data(df_processed.head(10)),
-                "summary_stats": processed_data.get("summary_stats", {}),
-                "variable_types": self.datasets[original_filename].get("variable_types", {}),
-                "is_processed": True,  # Marcar como dataset procesado
-                "original_dataset": original_filename,  # Referencia al dataset original
-                "processing_steps": processed_data.get("processing_steps", []),  # Pasos aplicados
-                "original_rows": processed_data.get("original_rows", 0),  # Filas originales
-                "rows_removed": processed_data.get("rows_removed", 0)  # Filas eliminadas
-            }
+            self.write_processed_dataset(df_processed, new_file_path)
             
-            # Guardar en la base de datos
-            self.datasets[new_dataset["filename"]] = new_dataset
-            self.save_datasets()
-            
-            print(f"Dataset procesado guardado: {new_dataset['filename']}")
-            return new_dataset
+            return self.register_processed_dataset(
+                original_filename, processed_data, df_processed, new_filename, new_file_path
+            )
             
         except Exception as e:
-            print(f"Error en save_processed_dataset: {str(e)}")
+            logger.error("Error en save_processed_dataset: %s", e)
             raise Exception(f"Error guardando dataset procesado: {str(e)}")
+    
+    def prepare_processed_dataset(self, original_filename: str, new_name: str,
+                                  processed_data: Dict) -> Tuple[pd.DataFrame, str, str]:
+        """
+        Primera fase de save_processed_dataset: DataFrame a escribir y ruta del archivo.
+        
+        save_processed_dataset se divide en tres fases para que el servidor pueda ejecutar
+        solo la escritura del archivo (``_write_dataframe``, que no toca el estado del
+        procesador) en un hilo; esta fase y register_processed_dataset leen y modifican
+        ``self.datasets`` y los cachés, y deben ejecutarse en el hilo del event loop.
+        
+        Returns:
+            Tupla (DataFrame procesado, nombre del nuevo dataset, ruta del nuevo archivo).
+        """
+        # Reutilizar el DataFrame de apply_all_preprocessing si corresponde a los mismos
+        # pasos; si no, convertir los datos procesados de vuelta a DataFrame
+        df_processed = self._recall_processed_frame(
+            original_filename, processed_data.get("processing_steps", []), processed_data.get("rows")
+        )
+        if df_processed is None:
+            df_processed = pd.DataFrame(processed_data.get("processed_data", []))
+        
+        # Determinar la extensión del archivo original
+        original_file_path = self.datasets[original_filename]["file_path"]
+        file_extension = original_file_path.split('.')[-1].lower()
+        
+        # Crear nombre del archivo procesado
+        if file_extension in ['csv', 'xlsx', 'xls']:
+            new_filename = f"{new_name}.{file_extension}"
+        else:
+            new_filename = f"{new_name}.csv"
+        return df_processed, new_filename, f"uploads/{new_filename}"
+    
+    def write_processed_dataset(self, df_processed: pd.DataFrame, new_file_path: str):
+        """
+        Fase intermedia de save_processed_dataset: escribir el archivo en disco.
+        
+        No lee ni modifica el estado del procesador, por lo que puede ejecutarse en un hilo.
+        """
+        self._write_dataframe(df_processed, new_file_path)
+    
+    def register_processed_dataset(self, original_filename: str, processed_data: Dict,
+                                   df_processed: pd.DataFrame, new_filename: str,
+                                   new_file_path: str) -> Dict[str, Any]:
+        """
+        Última fase de save_processed_dataset: registrar el archivo ya escrito.
+        
+        Añade el dataset a ``self.datasets``, invalida sus cachés y persiste los metadatos.
+        """
+        new_dataset = {
+            "filename": new_filename,
+            "file_path": new_file_path,
+            "rows": processed_data.get("rows", len(df_processed)),
+            "columns": processed_data.get("columns", len(df_processed.columns)),
+            "uploaded_at": pd.Timestamp.now().isoformat(),
+            "preview": self.safe_preview_data(df_processed.head(10)),
+            "summary_stats": processed_data.get("summary_stats", {}),
+            "variable_types": processed_data.get("variable_types")
+                              or self.datasets[original_filename].get("variable_types", {}),
+            "is_processed": True,  # Marcar como dataset procesado
+            "original_dataset": original_filename,  # Referencia al dataset original
+            "processing_steps": processed_data.get("processing_steps", []),  # Pasos aplicados
+            "original_rows": processed_data.get("original_rows", 0),  # Filas originales
+            "rows_removed": processed_data.get("rows_removed", 0)  # Filas eliminadas
+        }
+        
+        # Guardar en la base de datos
+        self.datasets[new_dataset["filename"]] = new_dataset
+        
+        # Los cachés no se precargan con el DataFrame en memoria: sus dtypes (category,
+        # conversiones manuales, ...) no coinciden con los de volver a parsear el archivo
+        # escrito, y los resultados dependerían de si el caché estaba caliente. Se descarta
+        # cualquier entrada previa con el mismo nombre; la primera lectura parsea el archivo
+        self.clear_cache(new_dataset["filename"])
+        self.remove_from_disk_cache(new_file_path)
+        self._mark_dataset_changed(new_dataset["filename"])
+        self.save_datasets()
+        
+        logger.info("Dataset procesado guardado: %s", new_dataset['filename'])
+        return new_dataset
 
     # Helper methods for preprocessing
+    @staticmethod
+    def _missing_fill_values(df: pd.DataFrame, strategy: str, missing_counts: pd.Series = None) -> pd.Series:
+        """
+        Calcular de una vez los valores de imputación de las columnas con faltantes.
+        
+        Args:
+            df: DataFrame a imputar.
+            strategy: "fill_mean" o "fill_median" (columnas numéricas) o "fill_mode"
+                (columnas de texto y categóricas).
+            missing_counts: Faltantes por columna, si ya se calcularon.
+        
+        Returns:
+            Serie {columna: valor}. Con media o mediana puede contener NaN (columnas sin
+            ningún valor); con moda esas columnas se omiten.
+        """
+        if missing_counts is None:
+            missing_counts = df.isna().sum()
+        
+        if strategy == "fill_mode":
+            columns = [col for col, dtype in df.dtypes.items()
+                       if dtype == 'object' or isinstance(dtype, (pd.CategoricalDtype, pd.StringDtype))]
+        else:
+            columns = df.select_dtypes(include=[np.number]).columns
+        counts = missing_counts[columns]
+        target_columns = counts.index[counts.to_numpy() > 0]
+        if not len(target_columns):
+            return pd.Series(dtype=object)
+        
+        if strategy == "fill_mode":
+            # Primera moda de cada columna (NaN si la columna no tiene valores)
+            modes = df[target_columns].mode()
+            if not len(modes):
+                return pd.Series(dtype=object)
+            mode_values = modes.iloc[0]
+            return mode_values[mode_values.notna()]
+        return df[target_columns].agg("mean" if strategy == "fill_mean" else "median")
+    
     def _apply_missing_values_strategy(self, df: pd.DataFrame, strategy: str, constant_value: str = None) -> pd.DataFrame:
-        """Aplicar estrategia de valores faltantes"""
+        """Aplicar estrategia de valores faltantes (``df`` no se modifica; si no hay nada que tratar se devuelve tal cual)"""
         if strategy == "drop":
-            return df.dropna()
-        elif strategy == "fill_mean":
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_columns:
-                df[col] = df[col].fillna(df[col].mean())
-        elif strategy == "fill_median":
-            numeric_columns = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_columns:
-                df[col] = df[col].fillna(df[col].median())
-        elif strategy == "fill_mode":
-            for col in df.columns:
-                if df[col].dtype == 'object':
-                    mode_value = df[col].mode()
-                    if not mode_value.empty:
-                        df[col] = df[col].fillna(mode_value.iloc[0])
+            complete_rows = df.notna().all(axis=1)
+            return df if complete_rows.all() else df[complete_rows]
+        elif strategy in ("fill_mean", "fill_median", "fill_mode"):
+            fill_values = self._missing_fill_values(df, strategy)
+            fill_values = fill_values[fill_values.notna()]
+            if len(fill_values):
+                # Copia superficial: solo se materializan las columnas imputadas
+                df = df.copy(deep=False)
+                for column, value in fill_values.items():
+                    df[column] = df[column].fillna(value)
         elif strategy == "fill_constant" and constant_value is not None:
-            df = df.fillna(constant_value)
+            df = self._fillna_constant(df, constant_value)
         
         return df
 
+    @staticmethod
+    def _drop_duplicate_rows(df: pd.DataFrame, keep: str = 'first') -> pd.DataFrame:
+        """
+        Equivalente a ``df.drop_duplicates(keep=keep)`` con una ruta rápida para bloques numéricos anchos.
+        
+        Si todas las columnas comparten un mismo dtype entero o real y hay al menos
+        ``_DUPLICATES_FAST_PATH_MIN_COLUMNS`` columnas, cada fila se ve como un único valor de
+        bytes y ``np.unique`` encuentra la primera aparición de cada una en una sola ordenación,
+        en lugar de factorizar columna a columna. Los -0.0 y los NaN se normalizan antes para
+        que las filas iguales para pandas también lo sean byte a byte. Si no hay duplicados se
+        devuelve ``df`` sin copiar.
+        """
+        dtypes = set(df.dtypes)
+        dtype = next(iter(dtypes)) if len(dtypes) == 1 else None
+        if (dtype is None or not isinstance(dtype, np.dtype) or dtype.kind not in 'iuf'
+                or df.shape[1] < _DUPLICATES_FAST_PATH_MIN_COLUMNS or len(df) == 0):
+            duplicated = df.duplicated(keep=keep)
+            # Sin duplicados se devuelve el mismo DataFrame (sin copiarlo)
+            return df[~duplicated] if duplicated.any() else df
+        
+        values = df.to_numpy()
+        if keep == 'last':
+            values = values[::-1]
+        if dtype.kind == 'f':
+            values = values + 0.0  # Copia contigua; -0.0 pasa a 0.0
+            values[np.isnan(values)] = np.nan
+        else:
+            values = np.ascontiguousarray(values)
+        
+        rows = values.view(np.dtype((np.void, values.dtype.itemsize * values.shape[1]))).ravel()
+        _, first_positions = np.unique(rows, return_index=True)
+        if len(first_positions) == len(df):
+            return df
+        if keep == 'last':
+            first_positions = len(df) - 1 - first_positions
+        return df.iloc[np.sort(first_positions)]
+    
     def _apply_duplicates_strategy(self, df: pd.DataFrame, strategy: str) -> pd.DataFrame:
         """Aplicar estrategia de duplicados"""
         if strategy == "drop":
-            return df.drop_duplicates()
+            return self._drop_duplicate_rows(df)
         elif strategy == "keep_first":
-            return df.drop_duplicates(keep='first')
+            return self._drop_duplicate_rows(df, keep='first')
         elif strategy == "keep_last":
-            return df.drop_duplicates(keep='last')
+            return self._drop_duplicate_rows(df, keep='last')
         
         return df
 
+    # Kernel de cada combinación (método, estrategia); la transformación no depende del método
+    _OUTLIER_KERNELS = {
+        ("iqr", "remove"): "_iqr_remove",
+        ("iqr", "cap"): "_iqr_cap",
+        ("iqr", "transform"): "_log_transform",
+        ("zscore", "remove"): "_zscore_remove",
+        ("zscore", "cap"): "_zscore_cap",
+        ("zscore", "transform"): "_log_transform",
+    }
+    
     def _apply_outliers_strategy(self, df: pd.DataFrame, method: str, strategy: str) -> pd.DataFrame:
-        """Aplicar estrategia de outliers"""
-        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        """
+        Aplicar estrategia de outliers sobre todas las columnas numéricas a la vez.
         
-        for col in numeric_columns:
-            if method == "iqr":
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                
-                if strategy == "remove":
-                    df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-                elif strategy == "cap":
-                    df[col] = df[col].clip(lower=lower_bound, upper=upper_bound)
-                elif strategy == "transform":
-                    df[col] = np.log1p(df[col] - df[col].min() + 1)
-            
-            elif method == "zscore":
-                z_scores = np.abs((df[col] - df[col].mean()) / df[col].std())
-                
-                if strategy == "remove":
-                    df = df[z_scores < 3]
-                elif strategy == "cap":
-                    threshold = 3
-                    df[col] = df[col].clip(
-                        lower=df[col].mean() - threshold * df[col].std(),
-                        upper=df[col].mean() + threshold * df[col].std()
-                    )
-                elif strategy == "transform":
-                    df[col] = np.log1p(df[col] - df[col].min() + 1)
+        Los límites (IQR o media ± 3σ) se calculan por columna sobre los datos de entrada;
+        con "remove" se descartan en una sola operación las filas fuera de límites en
+        cualquier columna (o con NaN), con "cap" se recortan los valores y con "transform"
+        se aplica log1p(x - min + 1). El kernel de la combinación se elige una sola vez.
+        
+        Args:
+            df: DataFrame de entrada (no se modifica; el resultado comparte las columnas no tratadas).
+            method: "iqr" o "zscore".
+            strategy: "remove", "cap" o "transform".
+        
+        Returns:
+            DataFrame procesado.
+        """
+        kernel_name = self._OUTLIER_KERNELS.get((method, strategy))
+        if kernel_name is None:
+            return df
+        
+        numeric_columns = df.select_dtypes(include=[np.number]).columns
+        if len(numeric_columns) == 0:
+            return df
         
-        return df 
+        # Bloque numérico completo como un único ndarray float64 (reducciones por eje y
+        # operaciones in-place en NumPy); el kernel puede modificarlo
+        values = df[numeric_columns].to_numpy(dtype=np.float64, copy=True)
+        return getattr(self, kernel_name)(df, numeric_columns, values)
+    
+    @staticmethod
+    def _iqr_bounds(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Límites Q1 - 1.5·IQR y Q3 + 1.5·IQR por columna."""
+        Q1, Q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+        IQR = Q3 - Q1
+        return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR
+    
+    @staticmethod
+    def _log_transform(df: pd.DataFrame, columns: pd.Index, values: np.ndarray) -> pd.DataFrame:
+        """log1p(x - min + 1) por columna, in-place sobre el bloque."""
+        values -= np.nanmin(values, axis=0)
+        values += 1
+        np.log1p(values, out=values)
+        df = df.copy(deep=False)
+        df[columns] = values
+        return df
+    
+    def _iqr_remove(self, df: pd.DataFrame, columns: pd.Index, values: np.ndarray) -> pd.DataFrame:
+        """Descartar filas fuera de los límites IQR en cualquier columna (las filas con NaN también)."""
+        keep = _rows_within_bounds(values, *self._iqr_bounds(values))
+        return df if keep.all() else df[keep]
+    
+    def _iqr_cap(self, df: pd.DataFrame, columns: pd.Index, values: np.ndarray) -> pd.DataFrame:
+        """Recortar los valores a los límites IQR."""
+        lower_bound, upper_bound = self._iqr_bounds(values)
+        return self._cap_numeric_block(df, columns, values, lower_bound, upper_bound)
+    
+    @staticmethod
+    def _zscore_remove(df: pd.DataFrame, columns: pd.Index, values: np.ndarray) -> pd.DataFrame:
+        """Descartar filas con |z| >= 3 en cualquier columna (las filas con NaN también)."""
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            keep = _rows_within_zscore(values, means, stds)
+        return df if keep.all() else df[keep]
+    
+    def _zscore_cap(self, df: pd.DataFrame, columns: pd.Index, values: np.ndarray) -> pd.DataFrame:
+        """Recortar los valores a media ± 3σ."""
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+        threshold = 3
+        return self._cap_numeric_block(df, columns, values, means - threshold * stds, means + threshold * stds)
@@ -11,13 +11,83 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Any, Tuple, Optional
 import json
+import hashlib
 import logging
+from collections import OrderedDict
 import seaborn as sns
 
+# numexpr es opcional: evalúa el Z-Score en un solo recorrido sin temporales
+try:
+    import numexpr
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+# Backends acelerados opcionales para la búsqueda de vecinos de LOF
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+
+try:
+    from cuml.neighbors import NearestNeighbors as CumlNearestNeighbors
+    CUML_AVAILABLE = True
+except Exception:  # ImportError, o cuML instalado sin GPU/CUDA utilizable
+    CUML_AVAILABLE = False
+
+# numba (opcional): compila el kernel del modified z-score de MAD para series grandes
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    prange = range
+    NUMBA_AVAILABLE = False
+
+# Con backend="auto" solo compensa salir de sklearn a partir de este número de filas
+_ACCELERATED_MIN_SAMPLES = 10_000
+
+# Tamaño a partir del cual el MAD se calcula con el kernel de numba
+_NUMBA_MIN_SIZE = 1_000_000
+
 # Configurar logger para este módulo
 logger = logging.getLogger(__name__)
 
 
+def _mad_outlier_mask_kernel(values, threshold):
+    """Máscara |x - mediana| / (1.4826·MAD) > threshold sobre un array sin NaN."""
+    n = values.size
+    mask = np.zeros(n, dtype=np.bool_)
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return mask
+    scale = 1.4826 * mad
+    for i in prange(n):
+        mask[i] = abs((values[i] - median) / scale) > threshold
+    return mask
+
+
+if NUMBA_AVAILABLE:
+    # Sin fastmath: mismo redondeo y comparaciones que la ruta NumPy
+    _mad_outlier_mask_kernel = njit(parallel=True, cache=True)(_mad_outlier_mask_kernel)
+
+
+def _mad_outlier_mask(values: np.ndarray, threshold: float) -> np.ndarray:
+    """Máscara de outliers MAD; usa numba en series grandes si está disponible."""
+    if NUMBA_AVAILABLE and values.size >= _NUMBA_MIN_SIZE:
+        return _mad_outlier_mask_kernel(values, threshold)
+    median = np.median(values)
+    # Desviaciones absolutas en un solo buffer, reutilizado para el modified z-score
+    deviations = np.subtract(values, median)
+    np.abs(deviations, out=deviations)
+    mad = np.median(deviations)
+    if mad == 0:
+        return np.zeros(values.size, dtype=bool)
+    deviations /= 1.4826 * mad
+    return deviations > threshold
+
+
 class OutlierDetector:
     """
     Clase para la detección de outliers usando múltiples métodos estadísticos.
@@ -122,6 +192,9 @@ class OutlierDetector:
                 Si es None, debe proporcionarse al llamar métodos que requieren datasets.
         """
         self.data_processor = data_processor
+        # Caché LRU de resultados de _test_normality, indexado por el contenido de la serie
+        self._normality_cache: "OrderedDict[Tuple[str, str, int, float], Dict[str, Any]]" = OrderedDict()
+        self._normality_cache_max_size = 128
     
     def detect_outliers_iqr(self, data: pd.Series, factor: float = None) -> List[int]:
         """
@@ -157,8 +230,15 @@ class OutlierDetector:
             else:
                 factor = 1.5  # Estándar para muestras grandes
         
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+        finite_values = values[~np.isnan(values)]
+        if finite_values.size == 0:
+            return []  # Sin datos válidos (pandas devolvería cuartiles NaN)
+        
+        # Ambos cuartiles con una sola selección (interpolación lineal, como pandas).
+        # np.quantile usa np.partition (O(n), sin ordenación completa); finite_values
+        # es una copia propia, así que la partición se hace in-place sin otra copia
+        Q1, Q3 = np.quantile(finite_values, [0.25, 0.75], method='linear', overwrite_input=True)
         IQR = Q3 - Q1
         
         if IQR == 0:
@@ -167,8 +247,7 @@ class OutlierDetector:
         lower_bound = Q1 - factor * IQR
         upper_bound = Q3 + factor * IQR
         
-        outliers = data[(data < lower_bound) | (data > upper_bound)]
-        return outliers.index.tolist()
+        return data.index[(values < lower_bound) | (values > upper_bound)].tolist()
     
     def detect_outliers_zscore(self, data: pd.Series, threshold: float = 3.0,
                                 check_normality: bool = True, warn_on_non_normal: bool = True) -> List[int]:
@@ -224,9 +303,17 @@ class OutlierDetector:
                     }
                 )
         
-        z_scores = np.abs((data - data.mean()) / std)
-        outliers = data[z_scores > threshold]
-        return outliers.index.tolist()
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+        mean = data.mean()
+        if NUMEXPR_AVAILABLE:
+            mask = numexpr.evaluate("abs((values - mean) / std) > threshold")
+        else:
+            # Un único buffer: resta, división y valor absoluto in-place
+            z_scores = np.subtract(values, mean)
+            z_scores /= std
+            np.fabs(z_scores, out=z_scores)
+            mask = z_scores > threshold
+        return data.index[mask].tolist()
     
     def detect_outliers_mad(self, data: pd.Series, threshold: float = 3.0) -> List[int]:
         """
@@ -264,21 +351,19 @@ class OutlierDetector:
             Este método es preferible cuando los datos pueden tener outliers o
             no seguir una distribución normal.
         """
-        median = data.median()
-        mad = np.median(np.abs(data - median))
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
         
-        # Evitar división por cero
-        if mad == 0:
-            # Si MAD es cero, todos los valores son iguales a la mediana
+        # np.median propaga NaN: con valores faltantes (o sin datos) el MAD no está
+        # definido y no se marcan outliers (los llamadores pasan series sin NaN)
+        if values.size == 0 or np.isnan(values).any():
             return []
         
         # Calcular modified z-score usando la fórmula correcta
         # El factor 1.4826 hace que MAD sea consistente con la desviación estándar
         # para distribuciones normales: MAD_std = 1.4826 * MAD
         # modified_z_score = (x - median) / (1.4826 * MAD)
-        modified_z_scores = (data - median) / (1.4826 * mad)
-        outliers = data[np.abs(modified_z_scores) > threshold]
-        return outliers.index.tolist()
+        # Si MAD es cero (todos los valores iguales a la mediana) no hay outliers
+        return data.index[_mad_outlier_mask(values, threshold)].tolist()
     
     def detect_outliers_mahalanobis(self, data: pd.DataFrame, threshold: float = 3.0) -> List[int]:
         """
@@ -317,12 +402,11 @@ class OutlierDetector:
         
         Note:
             - Requiere al menos 2 observaciones y 2 variables numéricas.
-            - La matriz de covarianza debe ser invertible (no hay colinealidad perfecta).
+            - La matriz de covarianza debe ser definida positiva (no hay colinealidad perfecta).
             - Asume distribución normal multivariada.
             - Más robusto que métodos univariados cuando hay correlaciones entre variables.
         """
-        from scipy.spatial.distance import mahalanobis
-        from numpy.linalg import inv
+        from scipy.linalg import solve_triangular
         
         # Solo usar columnas numéricas
         numeric_data = data.select_dtypes(include=[np.number]).dropna()
@@ -330,35 +414,31 @@ class OutlierDetector:
             return []
         
         try:
+            X = np.ascontiguousarray(numeric_data.to_numpy(dtype=np.float64))
+            
             # Calcular matriz de covarianza
-            cov_matrix = np.cov(numeric_data.T)
+            cov_matrix = np.cov(X, rowvar=False)
             
-            # Verificar si la matriz es invertible
-            if np.linalg.det(cov_matrix) == 0:
+            # Factor de Cholesky Σ = L·Lᵀ; si falla, la matriz no es definida positiva
+            # (singular o colinealidad perfecta) y no hay distancia de Mahalanobis
+            try:
+                L = np.linalg.cholesky(cov_matrix)
+            except np.linalg.LinAlgError:
                 return []
             
-            inv_cov_matrix = inv(cov_matrix)
-            mean = numeric_data.mean()
-            
-            # Calcular distancias de Mahalanobis
-            mahal_distances = []
-            for i in range(len(numeric_data)):
-                row = numeric_data.iloc[i]
-                distance = mahalanobis(row, mean, inv_cov_matrix)
-                mahal_distances.append(distance)
+            # Blanquear los datos con L⁻¹ (una sola resolución triangular): la distancia de
+            # Mahalanobis es la norma euclídea de z_i = L⁻¹ (x_i - μ)
+            diff = X - X.mean(axis=0)
+            Z = solve_triangular(L, diff.T, lower=True)
+            mahal_distances = np.sqrt(np.einsum('ij,ij->j', Z, Z))
             
             # Identificar outliers
-            outlier_indices = []
-            for i, distance in enumerate(mahal_distances):
-                if distance > threshold:
-                    outlier_indices.append(numeric_data.index[i])
-            
-            return outlier_indices
+            return numeric_data.index[mahal_distances > threshold].tolist()
         except Exception:
             return []
     
     def detect_outliers_lof(self, data: pd.DataFrame, n_neighbors: int = None, 
-                            contamination: float = 0.05) -> List[int]:
+                            contamination: float = 0.05, backend: str = "auto") -> List[int]:
         """
         Detecta outliers usando Local Outlier Factor (LOF).
         
@@ -373,6 +453,9 @@ class OutlierDetector:
                 Por defecto None (calculado automáticamente).
             contamination: Proporción esperada de outliers. Por defecto 0.05 (5%),
                 más conservador que el 10% estándar.
+            backend: Backend para la búsqueda de vecinos: "sklearn", "gpu" (cuML),
+                "faiss" o "auto" (cuML o FAISS si están instalados y hay al menos
+                _ACCELERATED_MIN_SAMPLES filas; si no, sklearn). Por defecto "auto".
         
         Returns:
             Lista de índices de observaciones identificadas como outliers.
@@ -380,6 +463,8 @@ class OutlierDetector:
         
         Note:
             - Requiere al menos n_neighbors observaciones.
+            - Con cuML/FAISS solo se delega la búsqueda kNN; el LOF se calcula en NumPy
+              con las mismas fórmulas que sklearn (FAISS trabaja en float32).
             - Contamination más conservador (5% en lugar de 10%) para reducir falsos positivos.
             - n_neighbors dinámico adaptado al tamaño de muestra.
             - Efectivo para datos con múltiples clusters de diferentes densidades.
@@ -408,6 +493,15 @@ class OutlierDetector:
             # Contamination más conservador (5% en lugar de 10%)
             contamination = min(contamination, 0.1)  # Máximo 10%
             
+            knn_backend = self._resolve_backend(
+                backend, n_samples, {"gpu": CUML_AVAILABLE, "faiss": FAISS_AVAILABLE}
+            )
+            if knn_backend != "sklearn":
+                X = np.ascontiguousarray(numeric_data.to_numpy(dtype=np.float64))
+                distances, indices = self._knn_without_self(X, n_neighbors, knn_backend)
+                outlier_mask = self._lof_outlier_mask(distances, indices, contamination)
+                return numeric_data.index[outlier_mask].tolist()
+            
             lof = LocalOutlierFactor(n_neighbors=n_neighbors, contamination=contamination)
             predictions = lof.fit_predict(numeric_data)
             
@@ -417,6 +511,77 @@ class OutlierDetector:
         except Exception:
             return []
     
+    @staticmethod
+    def _resolve_backend(backend: str, n_samples: int, available: Dict[str, bool]) -> str:
+        """
+        Elige el backend efectivo para un método multivariado.
+        
+        Args:
+            backend: Backend solicitado ("auto", "sklearn" o una clave de available).
+            n_samples: Número de filas a procesar.
+            available: Backends acelerados en orden de preferencia y si están instalados.
+        
+        Returns:
+            Nombre del backend a usar; "sklearn" si el solicitado no está disponible.
+        """
+        if backend == "auto":
+            if n_samples < _ACCELERATED_MIN_SAMPLES:
+                return "sklearn"
+            return next((name for name, ok in available.items() if ok), "sklearn")
+        if backend in available and not available[backend]:
+            logger.warning("Backend '%s' no disponible; se usa sklearn", backend)
+            return "sklearn"
+        return backend if backend in available else "sklearn"
+    
+    @staticmethod
+    def _knn_without_self(X: np.ndarray, k: int, backend: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k vecinos más cercanos de cada fila de X dentro de X, excluyendo la propia fila.
+        
+        Equivale a NearestNeighbors.kneighbors() sin argumentos en sklearn: se piden
+        k + 1 vecinos y se descarta el propio punto (o el último vecino si, por
+        duplicados, el punto no aparece entre los resultados).
+        
+        Returns:
+            Tupla (distancias euclídeas, índices), ambas de forma (n, k).
+        """
+        n = len(X)
+        if backend == "gpu":
+            nn = CumlNearestNeighbors(n_neighbors=k + 1, output_type="numpy").fit(X)
+            distances, indices = nn.kneighbors(X)
+            distances = np.asarray(distances, dtype=np.float64)
+        else:
+            # FAISS: búsqueda exacta por fuerza bruta (BLAS), distancias L2 al cuadrado
+            X32 = np.ascontiguousarray(X, dtype=np.float32)
+            index = faiss.IndexFlatL2(X32.shape[1])
+            index.add(X32)
+            squared, indices = index.search(X32, k + 1)
+            distances = np.sqrt(np.maximum(squared, 0), dtype=np.float64)
+        indices = np.asarray(indices, dtype=np.int64)
+        
+        drop = indices == np.arange(n)[:, None]
+        drop[~drop.any(axis=1), -1] = True
+        keep = ~drop
+        return distances[keep].reshape(n, k), indices[keep].reshape(n, k)
+    
+    @staticmethod
+    def _lof_outlier_mask(distances: np.ndarray, indices: np.ndarray,
+                          contamination: float) -> np.ndarray:
+        """
+        Máscara de outliers LOF a partir del grafo kNN (mismas fórmulas que sklearn).
+        
+        Returns:
+            Array booleano, True para las observaciones marcadas como outliers.
+        """
+        # Distancia de alcanzabilidad y densidad local de alcanzabilidad (LRD)
+        k_distances = distances[:, -1]
+        reach_distances = np.maximum(distances, k_distances[indices])
+        lrd = 1.0 / (reach_distances.mean(axis=1) + 1e-10)
+        
+        negative_outlier_factor = -(lrd[indices].mean(axis=1) / lrd)
+        offset = np.percentile(negative_outlier_factor, 100.0 * contamination)
+        return negative_outlier_factor < offset
+    
     def detect_outliers_isolation_forest(self, data: pd.DataFrame, contamination: float = 0.05) -> List[int]:
         """
         Detecta outliers usando Isolation Forest.
@@ -484,10 +649,41 @@ class OutlierDetector:
                 - p_value: p-valor del test
                 - warning: Mensaje de advertencia si los datos no son normales
         """
+        # Misma convención que los detectores: n cuenta también los NaN
+        values = data.dropna().to_numpy()
+        if values.dtype.kind in 'biuf':
+            values = values.astype(np.float64, copy=False)
+        return self._test_normality_array(values, n=len(data), alpha=alpha)
+    
+    def _test_normality_array(self, values: np.ndarray, n: Optional[int] = None,
+                              alpha: float = 0.05) -> Dict[str, Any]:
+        """
+        Núcleo de _test_normality sobre un array ya sin NaN.
+        
+        Permite a los detectores que ya trabajan con el ndarray limpio (p. ej. Grubbs)
+        reutilizarlo sin volver a pasar por dropna().
+        
+        Args:
+            values: Array con los datos numéricos, sin valores faltantes.
+            n: Tamaño de la muestra original (incluyendo NaN), usado para elegir el
+                test. Por defecto len(values).
+            alpha: Nivel de significancia para el test de normalidad. Por defecto 0.05.
+        
+        Returns:
+            Diccionario con el mismo formato que _test_normality.
+        """
         from scipy import stats
         
-        n = len(data)
-        data_clean = data.dropna()
+        # Varios detectores paramétricos (Z-Score, Grubbs, ...) validan la misma serie:
+        # el resultado se reutiliza si el contenido, el tamaño y alpha coinciden
+        if n is None:
+            n = len(values)
+        cache_key = self._normality_cache_key(values, n, alpha)
+        if cache_key is not None and cache_key in self._normality_cache:
+            self._normality_cache.move_to_end(cache_key)
+            return dict(self._normality_cache[cache_key])
+        
+        data_clean = values
         
         if len(data_clean) < 3:
             return {
@@ -532,13 +728,33 @@ class OutlierDetector:
                 f"Considere usar métodos no paramétricos como IQR o MAD."
             )
         
-        return {
+        result = {
             "is_normal": is_normal,
             "test_name": test_name,
             "statistic": float(statistic) if statistic is not None else None,
             "p_value": float(p_value) if p_value is not None else None,
             "warning": warning
         }
+        
+        if cache_key is not None:
+            self._normality_cache[cache_key] = result
+            if len(self._normality_cache) > self._normality_cache_max_size:
+                self._normality_cache.popitem(last=False)
+        return dict(result)
+    
+    @staticmethod
+    def _normality_cache_key(values: np.ndarray, n: int, alpha: float) -> Optional[Tuple[str, str, int, float]]:
+        """
+        Clave de caché para _test_normality a partir del contenido de los datos.
+        
+        Se usa un hash de los valores (no id(data)) para que una serie modificada o un
+        objeto reciclado nunca devuelva un resultado obsoleto. Solo se cachean datos
+        numéricos; para otros dtypes devuelve None.
+        """
+        if values.dtype.kind not in 'biuf':
+            return None
+        digest = hashlib.blake2b(np.ascontiguousarray(values).tobytes(), digest_size=16).hexdigest()
+        return (digest, values.dtype.str, n, round(float(alpha), 6))
     
     def _calculate_grubbs_pvalue(self, grubbs_stat: float, n: int) -> float:
         """
@@ -632,10 +848,15 @@ class OutlierDetector:
             )
             return []
         
+        # Un solo ndarray sin NaN para el test de normalidad y el estadístico
+        values = data.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = ~np.isnan(values)
+        arr = values[valid]
+        
         # Validar normalidad si está habilitado
         normality_result = None
         if check_normality:
-            normality_result = self._test_normality(data, alpha=alpha)
+            normality_result = self._test_normality_array(arr, n=n, alpha=alpha)
             
             if not normality_result["is_normal"] and warn_on_non_normal:
                 logger.warning(
@@ -647,23 +868,24 @@ class OutlierDetector:
                     }
                 )
         
-        # Limpiar datos (remover NaN)
-        data_clean = data.dropna()
-        if len(data_clean) < 3:
+        m = len(arr)
+        if m < 3:
             return []
         
-        std = data_clean.std()
+        # Calcular estadístico de Grubbs: las desviaciones a la media sirven tanto
+        # para la desviación estándar (ddof=1) como para localizar el valor más extremo
+        mean = arr.mean()
+        deviations = arr - mean
+        std = np.sqrt(np.dot(deviations, deviations) / (m - 1))
         if std == 0 or np.isnan(std):
             return []  # Todos los valores son iguales o hay problemas numéricos
         
-        # Calcular estadístico de Grubbs
-        mean = data_clean.mean()
-        
         # Test de Grubbs para el valor más extremo
-        max_deviation_idx = (np.abs(data_clean - mean)).idxmax()
-        max_deviation = np.abs(data_clean[max_deviation_idx] - mean)
+        abs_deviations = np.abs(deviations, out=deviations)
+        max_position = int(abs_deviations.argmax())
+        max_deviation_idx = data.index[valid][max_position]
         
-        grubbs_stat = max_deviation / std
+        grubbs_stat = abs_deviations[max_position] / std
         
         # Valor crítico de Grubbs (fórmula correcta)
         t_val = stats.t.ppf(1 - alpha / (2 * n), n - 2)
@@ -2257,7 +2479,7 @@ class OutlierDetector:
             logger.error(
                 error_msg,
                 extra={
-                    'filename': filename,
+                    'dataset_filename': filename,
                     'numeric_variable': numeric_variable,
                     'categorical_variable': categorical_variable,
                     'error': str(e)
@@ -2354,7 +2576,7 @@ class OutlierDetector:
             logger.error(
                 error_msg,
                 extra={
-                    'filename': filename,
+                    'dataset_filename': filename,
                     'categorical_variable1': categorical_variable1,
                     'categorical_variable2': categorical_variable2,
                     'error': str(e)
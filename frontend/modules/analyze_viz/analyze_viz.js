@@ -10296,6 +10296,9 @@ if (typeof window.analyzeVizModule === 'undefined') {
                 return;
             }
 
+            const oversampleCheck = document.getElementById('oversampleMinorityCheck');
+            const oversampleMinority = oversampleCheck ? oversampleCheck.checked : false;
+
             const button = document.getElementById('runPredictiveModel');
             const originalText = button.innerHTML;
             button.innerHTML = '<span class="spinner-border spinner-border-sm me-2"></span>Entrenando modelo...';
@@ -10306,7 +10309,8 @@ if (typeof window.analyzeVizModule === 'undefined') {
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ 
                     outlier_results: this.outlierResults,
-                    predictors: predictors
+                    predictors: predictors,
+                    oversample_minority: oversampleMinority
                 })
             });
 
@@ -10393,7 +10397,7 @@ if (typeof window.analyzeVizModule === 'undefined') {
         if (!container) return;
 
         let html = '<div class="card"><div class="card-body">';
-        html += `<h5 class="mb-4"><i class="fas fa-brain me-2"></i>Resultados del Modelo Random Forest</h5>`;
+        html += `<h5 class="mb-4"><i class="fas fa-brain me-2"></i>Resultados del Modelo ${results.model_type || 'Random Forest'}</h5>`;
         
         // Panel de métricas principales
         html += '<div class="row mb-4">';
@@ -10421,10 +10425,19 @@ if (typeof window.analyzeVizModule === 'undefined') {
         // Mostrar parámetros del modelo
         if (results.model_params) {
             html += `<div class="alert alert-secondary mb-4"><strong>Parámetros del Modelo:</strong> `;
-            html += `Árboles: ${results.model_params.n_estimators}, `;
-            html += `Profundidad máxima: ${results.model_params.max_depth}, `;
-            html += `Mínimo muestras para dividir: ${results.model_params.min_samples_split}, `;
-            html += `Mínimo muestras por hoja: ${results.model_params.min_samples_leaf}, `;
+            if (results.model_params.learning_rate !== undefined) {
+                // Histogram Gradient Boosting
+                html += `Iteraciones: ${results.model_params.n_iter !== undefined ? results.model_params.n_iter : results.model_params.max_iter}, `;
+                html += `Tasa de aprendizaje: ${results.model_params.learning_rate}, `;
+                html += `Hojas máximas por árbol: ${results.model_params.max_leaf_nodes}, `;
+                html += `Mínimo muestras por hoja: ${results.model_params.min_samples_leaf}, `;
+                html += `Regularización L2: ${results.model_params.l2_regularization}, `;
+            } else {
+                html += `Árboles: ${results.model_params.n_estimators}, `;
+                html += `Profundidad máxima: ${results.model_params.max_depth}, `;
+                html += `Mínimo muestras para dividir: ${results.model_params.min_samples_split}, `;
+                html += `Mínimo muestras por hoja: ${results.model_params.min_samples_leaf}, `;
+            }
             html += `Muestras entrenamiento: ${results.training_size}, `;
             html += `Muestras prueba: ${results.test_size}`;
             if (results.training_class_distribution && results.test_class_distribution) {
@@ -10446,9 +10459,13 @@ if (typeof window.analyzeVizModule === 'undefined') {
         
         // Gráfico de Importancia de Variables
         if (results.feature_importance && results.feature_importance.length > 0) {
+            // Random Forest: importancia por impureza; Histogram Gradient Boosting: por permutación (normalizada)
+            const importanceLabel = results.importance_type === 'permutation'
+                ? ' <small class="text-muted">(por permutación, normalizada)</small>'
+                : ' <small class="text-muted">(por impureza)</small>';
             html += '<div class="row mb-4">';
             html += '<div class="col-md-6">';
-            html += '<h6 class="mb-3"><i class="fas fa-chart-bar me-2"></i>Importancia de Variables</h6>';
+            html += `<h6 class="mb-3"><i class="fas fa-chart-bar me-2"></i>Importancia de Variables${importanceLabel}</h6>`;
             html += '<div id="featureImportancePlot"></div>';
             html += '</div>';
             
@@ -10460,11 +10477,11 @@ if (typeof window.analyzeVizModule === 'undefined') {
             html += '</div>';
             
             // Tabla de Importancia
-            html += '<h6 class="mt-4">Tabla de Importancia de Variables</h6>';
+            html += `<h6 class="mt-4">Tabla de Importancia de Variables${importanceLabel}</h6>`;
             html += '<div class="table-responsive"><table class="table table-sm table-hover"><thead><tr><th>Variable</th><th>Importancia</th><th>%</th></tr></thead><tbody>';
             const totalImportance = results.feature_importance.reduce((sum, f) => sum + f.importance, 0);
             results.feature_importance.forEach(feat => {
-                const percentage = (feat.importance / totalImportance * 100).toFixed(2);
+                const percentage = totalImportance > 0 ? (feat.importance / totalImportance * 100).toFixed(2) : '0.00';
                 html += `<tr><td>${feat.variable}</td><td>${feat.importance.toFixed(4)}</td><td>${percentage}%</td></tr>`;
             });
             html += '</tbody></table></div>';
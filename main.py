@@ -7,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request as StarletteRequest
 import uvicorn
+import asyncio
 import os
 import json
 from pathlib import Path
@@ -18,8 +19,15 @@ import uuid
 import time
 import re
 import mimetypes
+import logging
 from werkzeug.utils import secure_filename
 
+# Nivel de log de la aplicación (INFO por defecto; LOG_LEVEL=DEBUG muestra el detalle del preprocesamiento)
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 # Importar módulos de análisis
 from analysis_core.data_processing import DataProcessor
 from analysis_core.analysis_and_viz import AnalysisAndVisualization
@@ -380,6 +388,10 @@ async def upload_dataset(file: UploadFile = File(...)):
         
         print(f"Guardando archivo en: {file_path}")
         
+        # Si se reemplaza un dataset existente, descartar sus DataFrames en caché
+        data_processor.clear_cache(file.filename)
+        data_processor.remove_from_disk_cache(file_path)
+        
         # Guardar archivo
         with open(file_path, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
@@ -614,6 +626,10 @@ async def delete_dataset(filename: str):
     if os.path.exists(file_path):
         os.remove(file_path)
     
+    # Descartar los DataFrames en caché (memoria y disco) del dataset eliminado
+    data_processor.clear_cache(filename)
+    data_processor.remove_from_disk_cache(file_path)
+    
     # Eliminar de la base de datos
     del data_processor.datasets[filename]
     data_processor.save_datasets()
@@ -687,7 +703,16 @@ async def save_processed_dataset(request: dict):
         new_name = request.get("new_name")
         processed_data = request.get("processed_data")
         
-        result = data_processor.save_processed_dataset(original_filename, new_name, processed_data)
+        # Solo la escritura del archivo (CSV o Excel) se hace en un hilo para no bloquear el
+        # event loop; DataProcessor no tiene locks, así que el registro del dataset y los
+        # cachés se actualizan aquí, en el hilo del event loop
+        df_processed, new_filename, new_file_path = data_processor.prepare_processed_dataset(
+            original_filename, new_name, processed_data
+        )
+        await asyncio.to_thread(data_processor.write_processed_dataset, df_processed, new_file_path)
+        result = data_processor.register_processed_dataset(
+            original_filename, processed_data, df_processed, new_filename, new_file_path
+        )
         return {"success": True, "dataset": result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -2584,6 +2609,7 @@ async def perform_predictive_model_analysis(filename: str, request: dict):
         dataset_info = data_processor.datasets[filename]
         outlier_results = request.get('outlier_results', {})
         predictors = request.get('predictors', None)
+        oversample_minority = bool(request.get('oversample_minority', False))
         
         if not outlier_results:
             raise HTTPException(status_code=400, detail="Resultados de outliers requeridos")
@@ -2593,7 +2619,8 @@ async def perform_predictive_model_analysis(filename: str, request: dict):
         variable_types['es_outlier'] = 'cualitativa_nominal_binaria'
         
         # Pasar outlier_results para excluir subject_id_column de predictores
-        results = analysis_viz.predictive_model_analysis(df, variable_types, predictors, outlier_results)
+        results = analysis_viz.predictive_model_analysis(df, variable_types, predictors, outlier_results,
+                                                         oversample_minority=oversample_minority)
         
         if 'error' in results:
             # Si hay información adicional (available_data_points, minimum_required, etc.), devolver el objeto completo
@@ -56,7 +56,7 @@ def sample_dataframe():
 @pytest.fixture
 def data_processor_with_temp_dir(temp_data_dir):
     """Crear DataProcessor con directorio temporal"""
-    processor = DataProcessor()
+    processor = DataProcessor(df_cache_dir=os.path.join(temp_data_dir, "df_cache"))
     # Cambiar el archivo de datasets a uno temporal
     processor.datasets_file = os.path.join(temp_data_dir, "datasets.json")
     processor.datasets = {}
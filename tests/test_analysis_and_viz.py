@@ -74,3 +74,85 @@ class TestAnalysisAndVisualization:
         assert result is not None
         assert isinstance(result, dict)
 
+    
+    def test_predictive_model_cache(self, analysis_viz):
+        """Test de reutilización del modelo predictivo en caché"""
+        rng = np.random.default_rng(0)
+        n = 60
+        is_outlier = rng.random(n) < 0.3
+        df = pd.DataFrame({
+            'x1': rng.normal(0, 1, n) + is_outlier * 2,
+            'category': rng.choice(['A', 'B'], n),
+            'es_outlier': np.where(is_outlier, 'Outlier', 'No Outlier')
+        })
+        variable_types = {
+            'x1': 'cuantitativa_continua',
+            'category': 'cualitativa_nominal_binaria'
+        }
+        
+        first = analysis_viz.predictive_model_analysis(df, variable_types)
+        second = analysis_viz.predictive_model_analysis(df, variable_types)
+        
+        assert first.get('success') is True
+        assert second == first
+        assert second is not first
+        assert len(analysis_viz._pred_model_cache) == 1
+    
+    def test_predictive_model_importance_normalized(self, analysis_viz):
+        """Test de importancias comparables entre modelos: no negativas, suman 1 y se etiqueta el tipo"""
+        rng = np.random.default_rng(1)
+        for n, expected_type in ((60, 'impurity'), (300, 'permutation')):
+            is_outlier = rng.random(n) < 0.3
+            df = pd.DataFrame({
+                'x1': rng.normal(0, 1, n) + is_outlier * 2,
+                'x2': rng.normal(0, 1, n),
+                'x3': rng.normal(0, 1, n),
+                'es_outlier': np.where(is_outlier, 'Outlier', 'No Outlier')
+            })
+            variable_types = {col: 'cuantitativa_continua' for col in ['x1', 'x2', 'x3']}
+            
+            result = analysis_viz.predictive_model_analysis(df, variable_types)
+            importances = [f['importance'] for f in result['feature_importance']]
+            
+            assert result['importance_type'] == expected_type
+            assert min(importances) >= 0
+            assert sum(importances) == pytest.approx(1.0)
+            assert result['feature_importance'][0]['variable'] == 'x1'
+    
+    def test_predictive_model_choice_boundary(self, analysis_viz):
+        """Test de HistGradientBoosting solo con más de 200 filas de entrenamiento y con sus propios hiperparámetros"""
+        rng = np.random.default_rng(3)
+        for n, expected_type in ((250, "Random Forest"), (300, "Histogram Gradient Boosting")):
+            is_outlier = np.arange(n) % 4 == 0
+            df = pd.DataFrame({
+                'x1': rng.normal(0, 1, n) + is_outlier * 2,
+                'es_outlier': np.where(is_outlier, 'Outlier', 'No Outlier')
+            })
+            
+            result = analysis_viz.predictive_model_analysis(df, {'x1': 'cuantitativa_continua'})
+            
+            assert result['model_type'] == expected_type
+        assert result['model_params']['learning_rate'] == 0.1
+        assert result['model_params']['max_leaf_nodes'] == 15
+        assert 'max_depth' not in result['model_params']
+    
+    def test_predictive_model_oversampling_keeps_model_choice(self, analysis_viz):
+        """Test de que las filas sintéticas de SMOTE no cambian el modelo elegido por tamaño"""
+        pytest.importorskip("imblearn")
+        rng = np.random.default_rng(2)
+        n = 230  # ~184 filas de entrenamiento: por debajo del umbral de HistGradientBoosting
+        is_outlier = np.arange(n) % 4 == 0
+        df = pd.DataFrame({
+            'x1': rng.normal(0, 1, n) + is_outlier * 2,
+            'x2': rng.normal(0, 1, n),
+            'es_outlier': np.where(is_outlier, 'Outlier', 'No Outlier')
+        })
+        variable_types = {'x1': 'cuantitativa_continua', 'x2': 'cuantitativa_continua'}
+        
+        plain = analysis_viz.predictive_model_analysis(df, variable_types)
+        oversampled = analysis_viz.predictive_model_analysis(df, variable_types, oversample_minority=True)
+        
+        assert oversampled['model_params']['oversampling'] == "SMOTE"
+        assert oversampled['model_params']['training_samples'] >= 200
+        assert oversampled['model_type'] == plain['model_type'] == "Random Forest"
+        assert oversampled['model_params']['max_depth'] == plain['model_params']['max_depth']
@@ -6,7 +6,9 @@ import pandas as pd
 import numpy as np
 import os
 import json
+import shutil
 from pathlib import Path
+import analysis_core.data_processing as data_processing_module
 from analysis_core.data_processing import DataProcessor
 
 
@@ -51,6 +53,21 @@ class TestDataProcessor:
         # Variable categórica nominal
         nominal = pd.Series(['A', 'B', 'C', 'D'] * 5)
         assert processor.classify_variable_type(nominal) == "cualitativa_nominal"
+
+    def test_classify_variable_types(self, data_processor_with_temp_dir):
+        """Test de clasificación en bloque (mismo criterio que por columna)"""
+        processor = data_processor_with_temp_dir
+
+        df = pd.DataFrame({
+            'continua': np.random.normal(100, 15, 100),
+            'discreta': [1, 2, 3, 4] * 25,
+            'binaria': ['A', 'B'] * 50,
+            'nominal': ['A', 'B', 'C', 'D'] * 25,
+        })
+        expected = {column: processor.classify_variable_type(df[column]) for column in df.columns}
+
+        assert processor.classify_variable_types(df) == expected
+        assert processor.classify_variable_types(df, ['nominal']) == {'nominal': 'cualitativa_nominal'}
     
     def test_process_dataset(self, data_processor_with_temp_dir, sample_csv_file):
         """Test de procesamiento de dataset"""
@@ -140,3 +157,303 @@ class TestDataProcessor:
         assert isinstance(preview, list)
         assert len(preview) <= 5
 
+    
+    def test_dataframe_cache_lru_eviction(self, data_processor_with_temp_dir):
+        """Test de expulsión LRU del caché de DataFrames"""
+        processor = data_processor_with_temp_dir
+        df = pd.DataFrame({'a': range(1000)})
+        # Espacio para dos DataFrames como máximo
+        processor.max_cache_size_mb = 2.5 * processor._estimate_df_bytes(df) / (1024 * 1024)
+        
+        processor._update_cache("a.csv", df)
+        processor._update_cache("b.csv", df.copy())
+        # Acceder a "a.csv" lo convierte en el más reciente
+        processor._dataframe_cache.move_to_end("a.csv")
+        processor._update_cache("c.csv", df.copy())
+        
+        assert list(processor._dataframe_cache) == ["a.csv", "c.csv"]
+        assert processor._cache_bytes == sum(processor._cache_sizes.values())
+
+    def test_apply_outliers_strategy_remove_single_mask(self, data_processor_with_temp_dir):
+        """Test de eliminación de outliers con una sola máscara para todas las columnas"""
+        processor = data_processor_with_temp_dir
+        df = pd.DataFrame({
+            'a': [1.0, 2.0, 3.0, 4.0, 5.0, 100.0, 3.0, 2.0],
+            'b': [10.0, 11.0, 12.0, -90.0, 11.0, 12.0, 10.0, 11.0],
+            'c': list('abcdefgh'),
+        })
+        original = df.copy()
+
+        result = processor._apply_outliers_strategy(df, "iqr", "remove")
+
+        # Se descartan las filas con un outlier en cualquier columna numérica
+        assert list(result.index) == [0, 1, 2, 4, 6, 7]
+        # El DataFrame de entrada no se modifica
+        pd.testing.assert_frame_equal(df, original)
+    
+    def test_apply_outliers_strategy_transform(self, data_processor_with_temp_dir):
+        """Test de transformación logarítmica del bloque numérico"""
+        processor = data_processor_with_temp_dir
+        df = pd.DataFrame({
+            'a': [-3.0, 0.0, 5.0, np.nan],
+            'b': [1, 2, 3, 40],
+            'c': list('wxyz'),
+        })
+        
+        result = processor._apply_outliers_strategy(df, "iqr", "transform")
+        
+        for column in ['a', 'b']:
+            expected = np.log1p(df[column] - df[column].min() + 1)
+            np.testing.assert_allclose(result[column], expected)
+        assert result['c'].tolist() == list('wxyz')
+    
+    def test_preprocessing_helpers_keep_string_dtype(self, data_processor_with_temp_dir):
+        """Test de los helpers de preprocesamiento sobre columnas de texto con dtype string"""
+        processor = data_processor_with_temp_dir
+        # Mismo comportamiento de faltantes (NaN) que las cadenas respaldadas por Arrow
+        string_dtype = pd.StringDtype("python", na_value=np.nan)
+        df = pd.DataFrame({
+            'texto': pd.Series(['a', None, 'b', 'a', 'a'], dtype=string_dtype),
+            'valor': [1.0, 2.0, np.nan, 1.0, 1.0],
+        })
+        
+        filled = processor._apply_missing_values_strategy(df, "fill_mode")
+        assert filled['texto'].dtype == string_dtype
+        assert filled['texto'].tolist() == ['a', 'a', 'b', 'a', 'a']
+        
+        dropped = processor._apply_missing_values_strategy(df, "drop")
+        assert dropped['texto'].dtype == string_dtype
+        assert list(dropped.index) == [0, 3, 4]
+        
+        deduplicated = processor._apply_duplicates_strategy(df, "drop")
+        assert list(deduplicated.index) == [0, 1, 2]
+    
+    def test_processed_prefixes_invalidated_on_in_memory_change(self, data_processor_with_temp_dir, sample_csv_file):
+        """Test de invalidación de los prefijos de apply_all_preprocessing al cambiar el dataset en memoria"""
+        processor = data_processor_with_temp_dir
+        filename = "test_data.csv"
+        processor.datasets[filename] = processor.process_dataset(sample_csv_file, filename)
+        steps = [{"type": "duplicates", "strategy": "drop"}]
+        
+        processor.apply_all_preprocessing(filename, steps)
+        assert any(key[0] == filename for key in processor._processed_frames)
+        
+        # Cambiar los tipos no toca el archivo fuente, pero los prefijos dejan de ser válidos
+        variable_types = dict(processor.datasets[filename]["variable_types"])
+        variable_types["id"] = "cuantitativa_discreta"
+        processor.update_variable_types(filename, variable_types)
+        assert not any(key[0] == filename for key in processor._processed_frames)
+        
+        result = processor.apply_all_preprocessing(filename, steps)
+        assert result["variable_types"]["id"] == "cuantitativa_discreta"
+    
+    def test_saved_processed_dataset_loads_like_fresh_parse(self, data_processor_with_temp_dir, sample_csv_file,
+                                                            tmp_path, monkeypatch):
+        """Test de que un dataset procesado recién guardado se carga con los dtypes de un parseo nuevo"""
+        monkeypatch.chdir(tmp_path)
+        os.makedirs("uploads")
+        processor = data_processor_with_temp_dir
+        filename = "test_data.csv"
+        processor.datasets[filename] = processor.process_dataset(sample_csv_file, filename)
+        # Conversión en memoria a category que un CSV recién parseado no reproduce
+        processor.preprocess_data_types(filename, "convert", {"variable": "category", "target_type": "categorical"})
+        
+        result = processor.apply_all_preprocessing(filename, [{"type": "duplicates", "strategy": "drop"}])
+        saved = processor.save_processed_dataset(filename, "procesado", result)
+        
+        loaded = processor.get_dataframe(saved["filename"])
+        # Parseo nuevo del archivo escrito, sin cachés en memoria ni en disco
+        processor.clear_cache()
+        shutil.rmtree(processor.df_cache_dir, ignore_errors=True)
+        fresh = processor.get_dataframe(saved["filename"], use_cache=False)
+        pd.testing.assert_frame_equal(loaded, fresh)
+    
+    def test_disk_cache_entries_removed(self, data_processor_with_temp_dir, sample_csv_file, temp_data_dir):
+        """Test de que el caché en disco vive en el directorio configurado y se limpia al borrar"""
+        processor = data_processor_with_temp_dir
+        assert processor.df_cache_dir == os.path.join(temp_data_dir, "df_cache")
+        
+        processor.process_dataset(sample_csv_file, "test_data.csv")
+        assert len(os.listdir(processor.df_cache_dir)) == 1
+        
+        processor.remove_from_disk_cache(sample_csv_file)
+        assert os.listdir(processor.df_cache_dir) == []
+    
+    def test_auto_category_conversion_same_cold_and_warm(self, data_processor_with_temp_dir, sample_csv_file):
+        """Test de que la conversión automática a category da los mismos dtypes en frío y en caliente"""
+        processor = data_processor_with_temp_dir
+        filename = "test_data.csv"
+        processor.datasets[filename] = processor.process_dataset(sample_csv_file, filename)
+        processor.preprocess_data_types(filename, "auto")
+        
+        warm = processor.get_dataframe(filename)
+        processor.clear_cache()
+        from_disk_cache = processor.get_dataframe(filename)
+        processor.clear_cache()
+        shutil.rmtree(processor.df_cache_dir)
+        fresh = processor.get_dataframe(filename)
+        
+        assert isinstance(warm['category'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_series_equal(from_disk_cache.dtypes, warm.dtypes)
+        pd.testing.assert_series_equal(fresh.dtypes, warm.dtypes)
+    
+    def test_summary_statistics_cache_follows_dataset_version(self, data_processor_with_temp_dir, sample_csv_file, monkeypatch):
+        """Test de que el caché de estadísticas se reutiliza hasta que el dataset cambia"""
+        processor = data_processor_with_temp_dir
+        filename = "test_data.csv"
+        processor.datasets[filename] = processor.process_dataset(sample_csv_file, filename)
+        df = processor.get_dataframe(filename)
+        variable_types = dict(processor.datasets[filename]["variable_types"])
+        
+        computed = []
+        numeric_stats = processor._numeric_stats
+        monkeypatch.setattr(processor, "_numeric_stats", lambda series: computed.append(series.name) or numeric_stats(series))
+        
+        cached = processor.get_summary_statistics(df, variable_types, filename=filename)
+        processor.update_variable_types(filename, dict(variable_types))
+        assert computed == []
+        assert cached == processor.datasets[filename]["summary_stats"]
+        
+        processor._mark_dataset_changed(filename)
+        processor.get_summary_statistics(df, variable_types, filename=filename)
+        assert 'variable1' in computed
+    
+    def test_dataset_preview_same_with_and_without_cache(self, data_processor_with_temp_dir, sample_csv_file):
+        """Test de que la lectura parcial de la vista previa aplica el mismo tratamiento que la carga completa"""
+        processor = data_processor_with_temp_dir
+        filename = "test_data.csv"
+        processor.datasets[filename] = processor.process_dataset(sample_csv_file, filename)
+        processor.clear_cache()
+        
+        head_df = processor._read_head(sample_csv_file, 5)
+        uncached_preview = processor.get_dataset_preview(filename, rows=5)
+        full_df = processor.get_dataframe(filename)
+        
+        pd.testing.assert_series_equal(head_df.dtypes, full_df.dtypes)
+        assert processor.get_dataset_preview(filename, rows=5) == uncached_preview
+
+
+def _same_values(fast: pd.DataFrame, fallback: pd.DataFrame):
+    """Mismas columnas, mismos faltantes y mismos valores (sin exigir el mismo dtype)"""
+    assert list(fast.columns) == list(fallback.columns)
+    assert len(fast) == len(fallback)
+    np.testing.assert_array_equal(fast.isna().to_numpy(), fallback.isna().to_numpy())
+    for column in fast.columns:
+        valid = fast[column].notna().to_numpy()
+        assert fast[column].to_numpy(dtype=object)[valid].tolist() == \
+            fallback[column].to_numpy(dtype=object)[valid].tolist()
+
+
+@pytest.fixture
+def mixed_dataframe():
+    """DataFrame con enteros, flotantes con NaN, texto y fechas con faltantes y booleanos"""
+    rng = np.random.default_rng(0)
+    n = 500
+    timestamps = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10**6, n), unit='min')
+    return pd.DataFrame({
+        'entero': rng.integers(-1000, 1000, n),
+        'flotante': np.where(rng.random(n) < 0.1, np.nan, rng.normal(0, 1, n)),
+        'texto': np.where(rng.random(n) < 0.1, None, rng.choice(['a', 'b', 'ñandú'], n)),
+        'fecha': np.where(rng.random(n) < 0.1, None, timestamps.strftime('%Y-%m-%d')),
+        'fecha_hora': np.where(rng.random(n) < 0.1, None, timestamps.strftime('%Y-%m-%dT%H:%M:%S')),
+        'booleano': rng.random(n) < 0.5,
+    })
+
+
+class TestOptionalFastPaths:
+    """Rutas rápidas con dependencias opcionales frente a su respaldo pandas/NumPy"""
+    
+    def test_read_csv_polars_matches_pandas(self, data_processor_with_temp_dir, mixed_dataframe, tmp_path, monkeypatch):
+        """Lector CSV de polars frente al motor C de pandas"""
+        pytest.importorskip("polars")
+        pytest.importorskip("pyarrow")
+        processor = data_processor_with_temp_dir
+        csv_path = str(tmp_path / "datos.csv")
+        mixed_dataframe.to_csv(csv_path, index=False)
+        
+        fast = processor._read_csv(csv_path, 'utf-8')
+        monkeypatch.setattr(data_processing_module, "POLARS_AVAILABLE", False)
+        monkeypatch.setattr(data_processing_module, "PYARROW_AVAILABLE", False)
+        fallback = processor._read_csv(csv_path, 'utf-8')
+        
+        _same_values(fast, fallback)
+    
+    def test_read_csv_pyarrow_matches_pandas(self, data_processor_with_temp_dir, mixed_dataframe, tmp_path, monkeypatch):
+        """Motor pyarrow de read_csv frente al motor C de pandas"""
+        pytest.importorskip("pyarrow")
+        processor = data_processor_with_temp_dir
+        csv_path = str(tmp_path / "datos.csv")
+        mixed_dataframe.to_csv(csv_path, index=False)
+        
+        monkeypatch.setattr(data_processing_module, "POLARS_AVAILABLE", False)
+        fast = processor._read_csv(csv_path, 'utf-8')
+        monkeypatch.setattr(data_processing_module, "PYARROW_AVAILABLE", False)
+        fallback = processor._read_csv(csv_path, 'utf-8')
+        
+        _same_values(fast, fallback)
+    
+    def test_arrow_text_columns_keep_values(self, data_processor_with_temp_dir, mixed_dataframe):
+        """Columnas de texto en Arrow: mismos valores y faltantes; el resto sin cambios"""
+        pytest.importorskip("pyarrow")
+        processor = data_processor_with_temp_dir
+        
+        converted = processor._convert_text_columns_to_arrow(mixed_dataframe)
+        
+        text_cols = ['texto', 'fecha', 'fecha_hora']
+        assert all(isinstance(converted[column].dtype, pd.StringDtype) for column in text_cols)
+        assert (converted['texto'] == 'a').dtype == bool
+        _same_values(converted, mixed_dataframe)
+        pd.testing.assert_frame_equal(converted.drop(columns=text_cols), mixed_dataframe.drop(columns=text_cols))
+    
+    def test_write_csv_polars_matches_pandas(self, data_processor_with_temp_dir, mixed_dataframe, tmp_path, monkeypatch):
+        """Escritor CSV de polars frente a DataFrame.to_csv (mismo texto salvo la notación de flotantes)"""
+        pytest.importorskip("polars")
+        pytest.importorskip("pyarrow")
+        processor = data_processor_with_temp_dir
+        with_datetime = mixed_dataframe.assign(momento=pd.to_datetime(mixed_dataframe['fecha_hora']))
+        
+        for df in (mixed_dataframe, with_datetime):
+            fast_path = str(tmp_path / "polars.csv")
+            fallback_path = str(tmp_path / "pandas.csv")
+            processor._write_dataframe(df, fast_path)
+            with monkeypatch.context() as patch:
+                patch.setattr(data_processing_module, "POLARS_AVAILABLE", False)
+                processor._write_dataframe(df, fallback_path)
+            
+            pd.testing.assert_frame_equal(pd.read_csv(fast_path), pd.read_csv(fallback_path))
+            as_text = dict(dtype=str, keep_default_na=False)
+            pd.testing.assert_frame_equal(pd.read_csv(fast_path, **as_text).drop(columns='flotante'),
+                                          pd.read_csv(fallback_path, **as_text).drop(columns='flotante'))
+    
+    def test_clean_dataframe_for_json_polars_matches_numpy(self, data_processor_with_temp_dir, mixed_dataframe, monkeypatch):
+        """Registros JSON construidos con polars frente a la ruta de NumPy"""
+        pytest.importorskip("polars")
+        pytest.importorskip("pyarrow")
+        processor = data_processor_with_temp_dir
+        
+        fast = processor.clean_dataframe_for_json(mixed_dataframe)
+        monkeypatch.setattr(data_processing_module, "POLARS_AVAILABLE", False)
+        fallback = processor.clean_dataframe_for_json(mixed_dataframe)
+        
+        assert fast == fallback
+    
+    def test_numba_outlier_masks_match_numpy(self, monkeypatch):
+        """Kernels de numba de las máscaras IQR y Z-Score frente a la ruta NumPy"""
+        pytest.importorskip("numba")
+        monkeypatch.setattr(data_processing_module, "_NUMBA_MIN_CELLS", 0)
+        rng = np.random.default_rng(0)
+        values = rng.standard_t(3, size=(2000, 4))
+        values[::97, 1] = np.nan
+        lower = np.percentile(values[~np.isnan(values[:, 1])], 5) * np.ones(4)
+        upper = -lower
+        means = np.nanmean(values, axis=0)
+        stds = np.nanstd(values, axis=0, ddof=1)
+        
+        fast_bounds = data_processing_module._rows_within_bounds(values, lower, upper)
+        fast_zscore = data_processing_module._rows_within_zscore(values.copy(), means, stds, 2.0)
+        monkeypatch.setattr(data_processing_module, "NUMBA_AVAILABLE", False)
+        fallback_bounds = data_processing_module._rows_within_bounds(values, lower, upper)
+        fallback_zscore = data_processing_module._rows_within_zscore(values.copy(), means, stds, 2.0)
+        
+        np.testing.assert_array_equal(fast_bounds, fallback_bounds)
+        np.testing.assert_array_equal(fast_zscore, fallback_zscore)
@@ -16,7 +16,7 @@ class TestIntegration:
     def test_full_pipeline(self, temp_data_dir, sample_csv_file):
         """Test del pipeline completo: carga -> detección -> análisis"""
         # 1. Inicializar componentes
-        processor = DataProcessor()
+        processor = DataProcessor(df_cache_dir=os.path.join(temp_data_dir, "df_cache"))
         processor.datasets_file = os.path.join(temp_data_dir, "datasets.json")
         processor.datasets = {}
         
@@ -55,7 +55,7 @@ class TestIntegration:
     
     def test_data_processor_and_outlier_detector(self, temp_data_dir, sample_csv_file):
         """Test de integración entre DataProcessor y OutlierDetector"""
-        processor = DataProcessor()
+        processor = DataProcessor(df_cache_dir=os.path.join(temp_data_dir, "df_cache"))
         processor.datasets_file = os.path.join(temp_data_dir, "datasets.json")
         processor.datasets = {}
         
@@ -75,7 +75,7 @@ class TestIntegration:
     
     def test_error_handling_integration(self, temp_data_dir):
         """Test de manejo de errores en integración"""
-        processor = DataProcessor()
+        processor = DataProcessor(df_cache_dir=os.path.join(temp_data_dir, "df_cache"))
         processor.datasets_file = os.path.join(temp_data_dir, "datasets.json")
         processor.datasets = {}
         
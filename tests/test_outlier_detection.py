@@ -4,6 +4,7 @@ Tests unitarios para el módulo outlier_detection.py
 import pytest
 import pandas as pd
 import numpy as np
+import analysis_core.outlier_detection as outlier_detection_module
 from analysis_core.outlier_detection import OutlierDetector
 
 
@@ -101,6 +102,31 @@ class TestOutlierDetectorMultivariate:
         
         assert isinstance(outliers, list)
     
+    def test_lof_outlier_mask_matches_sklearn(self, outlier_detector):
+        """Test del LOF en NumPy usado por los backends cuML/FAISS (mismo resultado que sklearn)"""
+        from sklearn.neighbors import LocalOutlierFactor, NearestNeighbors
+        
+        X = np.random.standard_t(3, size=(200, 3))
+        X[5:8] = X[0]  # Duplicados: el propio punto puede no ser el primer vecino
+        k = 15
+        expected = LocalOutlierFactor(n_neighbors=k, contamination=0.05).fit_predict(X) == -1
+        
+        distances, indices = NearestNeighbors(n_neighbors=k).fit(X).kneighbors()
+        mask = outlier_detector._lof_outlier_mask(distances, indices, 0.05)
+        
+        np.testing.assert_array_equal(mask, expected)
+    
+    def test_resolve_backend(self, outlier_detector):
+        """Test de la elección del backend de LOF (respaldo a sklearn)"""
+        resolve = outlier_detector._resolve_backend
+        available = {"gpu": False, "faiss": True}
+        
+        assert resolve("auto", 100, available) == "sklearn"  # Pocas filas: no compensa
+        assert resolve("auto", 50_000, available) == "faiss"
+        assert resolve("gpu", 50_000, available) == "sklearn"  # Solicitado pero no instalado
+        assert resolve("faiss", 100, available) == "faiss"
+        assert resolve("sklearn", 50_000, {"gpu": True}) == "sklearn"
+    
     def test_detect_outliers_isolation_forest(self, outlier_detector):
         """Test de detección usando Isolation Forest"""
         detector = outlier_detector
@@ -160,6 +186,22 @@ class TestOutlierDetectorHypothesisTests:
         outliers = detector.detect_outliers_rosner(data, k=2, alpha=0.05)
         
         assert isinstance(outliers, list)
+    
+    def test_test_normality_cache(self, outlier_detector):
+        """Test del caché del test de normalidad (por contenido de la serie)"""
+        detector = outlier_detector
+        
+        data = pd.Series(np.random.normal(0, 1, 40))
+        first = detector._test_normality(data)
+        assert detector._test_normality(data.copy()) == first
+        assert len(detector._normality_cache) == 1
+        
+        # Otro contenido u otro alpha no reutilizan el resultado
+        modified = data.copy()
+        modified.iloc[0] = 100.0
+        detector._test_normality(modified)
+        detector._test_normality(data, alpha=0.01)
+        assert len(detector._normality_cache) == 3
 
 
 class TestOutlierDetectorIntegration:
@@ -213,3 +255,48 @@ class TestOutlierDetectorIntegration:
         assert result is not None
         assert result['combination_strategy'] == 'union'
 
+
+class TestOptionalFastPaths:
+    """Rutas rápidas con dependencias opcionales frente a su respaldo NumPy/sklearn"""
+    
+    def test_mad_numba_matches_numpy(self, outlier_detector, monkeypatch):
+        """Kernel de numba del MAD frente a la ruta NumPy"""
+        pytest.importorskip("numba")
+        monkeypatch.setattr(outlier_detection_module, "_NUMBA_MIN_SIZE", 0)
+        rng = np.random.default_rng(0)
+        data = pd.Series(rng.standard_t(3, 5001))
+        
+        fast = outlier_detector.detect_outliers_mad(data, threshold=3.0)
+        monkeypatch.setattr(outlier_detection_module, "NUMBA_AVAILABLE", False)
+        fallback = outlier_detector.detect_outliers_mad(data, threshold=3.0)
+        
+        assert len(fallback) > 0
+        assert fast == fallback
+    
+    def test_zscore_numexpr_matches_numpy(self, outlier_detector, monkeypatch):
+        """Z-Score evaluado con numexpr frente a la ruta NumPy"""
+        pytest.importorskip("numexpr")
+        rng = np.random.default_rng(0)
+        values = rng.standard_t(3, 20000)
+        values[::101] = np.nan
+        data = pd.Series(values)
+        
+        fast = outlier_detector.detect_outliers_zscore(data, threshold=3.0, check_normality=False)
+        monkeypatch.setattr(outlier_detection_module, "NUMEXPR_AVAILABLE", False)
+        fallback = outlier_detector.detect_outliers_zscore(data, threshold=3.0, check_normality=False)
+        
+        assert len(fallback) > 0
+        assert fast == fallback
+    
+    def test_knn_faiss_matches_sklearn(self):
+        """Vecinos de FAISS frente a NearestNeighbors de sklearn"""
+        pytest.importorskip("faiss")
+        from sklearn.neighbors import NearestNeighbors
+        rng = np.random.default_rng(0)
+        X = rng.normal(size=(500, 3))
+        
+        distances, indices = OutlierDetector._knn_without_self(X, 10, "faiss")
+        expected_distances, expected_indices = NearestNeighbors(n_neighbors=10).fit(X).kneighbors()
+        
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-5)
+        np.testing.assert_array_equal(indices, expected_indices)